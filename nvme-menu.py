@@ -10,7 +10,7 @@ import subprocess
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from utils.common import print_header, check_sudo_access, list_nvme_devices_nvme_cli
+from utils.common import print_header, check_sudo_access, list_nvme_devices
 
 def show_menu():
     print_header("NVMe QA Testing Menu")
@@ -32,7 +32,7 @@ def show_menu():
 
 def get_device_parameters(sample_name: str):
     """Get appropriate device parameters for samples that need them"""
-    controllers, namespaces = list_nvme_devices_nvme_cli()
+    controllers, namespaces = list_nvme_devices()
     
     namespace_samples = ["03_smart_monitoring.py", "04_health_csv_export.py", 
                         "06_formatting.py", "08_filesystem_ops.py"]
@@ -21,12 +21,22 @@ Usage:
 """
 
 from __future__ import annotations
-import os, sys, json, subprocess, time, io, base64, argparse, re, math, shlex
+import os, sys, json, subprocess, time, io, base64, argparse, re, math, shlex, tempfile, atexit, asyncio, shutil
+import copy, ctypes, fcntl, struct
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import matplotlib.pyplot as plt
+from typing import Any, Dict, List, Tuple, Optional, Sequence, Union
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing as mp
+import threading
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # headless: never initialize a GUI toolkit
+matplotlib.rcParams["svg.fonttype"] = "none"  # SVG text as <text>, not glyph paths
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.ticker import FuncFormatter, MaxNLocator
 
 # Optional YAML
 try:
@@ -35,6 +45,17 @@ try:
 except Exception:
     HAVE_YAML = False
 
+# Optional orjson (faster parsing of large nvme-cli / fio JSON)
+try:
+    import orjson  # type: ignore
+    HAVE_ORJSON = True
+except Exception:
+    HAVE_ORJSON = False
+
+def _json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes, via orjson when available."""
+    return orjson.loads(data) if HAVE_ORJSON else json.loads(data)
+
 # ============================
 # Defaults (used if no config)
 # ============================
@@ -47,6 +68,16 @@ DEFAULT_CFG: Dict[str, Any] = {
         "bs": "4k",
         "ioengine": "io_uring",
         "workloads": ["randread", "randwrite", "read", "write", "randrw"],
+        "batch": False,                 # True: one fio process, workloads run back-to-back
+        "direct": True,                 # O_DIRECT: bypass the page cache
+        "irq_coalesce": 0,              # NVMe Interrupt Coalescing (FID 0x08) during tests, e.g. 0x020a; 0 = untouched
+        "io_uring": {
+            "fixedbufs": True,          # pre-registered buffers; needs RLIMIT_MEMLOCK (raised in main)
+            "registerfiles": True,
+            "sqthread_poll": False,     # kernel SQ polling thread; burns a core per job
+            "hipri": False,             # polled completions on raw namespaces; needs nvme poll queues
+            "batch": 32,                # cap for iodepth_batch_submit / _complete_max
+        },
     },
     "controllers": {
         "explicit": [],                 # e.g. ["/dev/nvme0", "/dev/nvme1"]
@@ -81,9 +112,22 @@ DEFAULT_CFG: Dict[str, Any] = {
     },
     "telemetry": {
         "sensors_interval": 2,
+        "sensors_source": "sysfs",      # "sysfs" (hwmon pread) or "sensors" (lm-sensors, one fork per sample)
         "turbostat_interval": 2,
         "nvme_telemetry": True,
         "power_interval": 2,
+        "lspci_vv": False,              # True: also capture 'lspci -vv' per controller (slow)
+        "max_output_bytes": 1 << 20,    # head+tail kept from turbostat / telemetry-log output; 0 = all
+    },
+    "report": {
+        "inline": True,                 # False: JSON sections load lazily from a minified sidecar
+        "plots": True,                  # False: skip matplotlib rendering entirely
+        "image_format": "svg",          # "svg" (inline vector) or "png" (base64 raster)
+    },
+    "parallelism": {
+        "max_ns_workers": min(8, os.cpu_count() or 1),  # namespaces in flight on the shared pool
+        "max_ctrl_workers": 1,                          # controllers tested concurrently
+        "plot_workers": os.cpu_count() or 1,            # report plot processes; 1 renders in-process
     },
 }
 
@@ -92,7 +136,8 @@ DEFAULT_CFG: Dict[str, Any] = {
 # ============================
 import re as _re
 
-_ANSI_RE = _re.compile("\x1B\\[[0-9;?]*[ -/]*[@-~]")  # CSI sequences
+_ANSI_RE = _re.compile("\x1B\\[[0-9;?]*[ -/]*[@-~]")
+_BS_RUN_RE = _re.compile(r"(\x08+)")     # a run of backspaces (kept by split)
 
 def _strip_ansi(s: str) -> str:
     if not isinstance(s, str):
@@ -101,72 +146,256 @@ def _strip_ansi(s: str) -> str:
 
 def _normalize_cr(s: str) -> str:
     """
-    For lines with carriage returns (progress redraw), keep only the final segment.
-    Example: "Alloc 10%\rAlloc 20%\rdone\n" -> "done\n"
+    Normalize line breaks in output containing carriage returns. splitlines() treats a
+    lone CR as a line break too, so each progress redraw stays on its own line and
+    CRLF becomes LF: "Alloc 10%\rdone\r\n" -> "Alloc 10%\ndone".
     """
     if not s or "\r" not in s:
         return s
-    fixed_lines: List[str] = []
-    for line in s.splitlines(keepends=False):
-        if "\r" in line:
-            fixed_lines.append(line.split("\r")[-1])
-        else:
-            fixed_lines.append(line)
-    return "\n".join(fixed_lines)
+    return "\n".join(s.splitlines())
 
 def _apply_backspaces(s: str) -> str:
     """
     Apply terminal-style backspaces robustly:
     - For every '\b', delete the previous kept character if any.
     - Works even if there are trailing '\b' without a prior char.
+    One split, then a single pass: each run of k '\b's drops the last k kept chars.
     """
     if not s or "\b" not in s:
         return s
-    out_chars: List[str] = []
-    for ch in s:
-        if ch == "\b":
-            if out_chars:
-                out_chars.pop()
+    out: List[str] = []
+    for i, part in enumerate(_BS_RUN_RE.split(s)):
+        if i % 2:
+            del out[-len(part):]
         else:
-            out_chars.append(ch)
-    return "".join(out_chars)
+            out.extend(part)
+    return "".join(out)
 
 def sanitize_cmd_output(s: str) -> str:
     if not isinstance(s, str):
         return s
+    if "\x1b" not in s and "\r" not in s and "\b" not in s and "\x00" not in s:
+        return s.strip()  # common case: plain output, no regex passes at all
     s = _strip_ansi(s)
     s = _normalize_cr(s)
     s = _apply_backspaces(s)
-    return s.replace("\x00", "").strip()
+    return s.replace("\x00", "").strip()  # NULs go last so a '\b' still counts them
 
 # ============================
 # Utils
 # ============================
+Argv = Union[str, Sequence[str]]
+
+@lru_cache(maxsize=None)
+def _which(name: str) -> Optional[str]:
+    return shutil.which(name)
+
 def cmd_exists(name: str) -> bool:
-    return subprocess.call(f"command -v {shlex.quote(name)} >/dev/null 2>&1", shell=True) == 0
+    return _which(name) is not None
 
-def run_cmd(cmd: str, require_root: bool = False) -> str:
-    """Run a shell command and return stdout (or prefixed error)."""
+def _argv(cmd: Argv, require_root: bool = False) -> List[str]:
+    """Normalize a command to an argv list (strings are shlex-split), prefixing sudo when needed."""
+    argv = shlex.split(cmd) if isinstance(cmd, str) else [str(a) for a in cmd]
+    if require_root and os.geteuid() != 0:
+        argv = ["sudo", "-n"] + argv
+    return argv
+
+def _spawn_kw(argv: List[str]) -> Dict[str, Any]:
+    """
+    Popen options for our children. Every fd Python opens is non-inheritable (PEP 446),
+    so the close_fds sweep is unnecessary; with it off and an absolute executable,
+    subprocess spawns via posix_spawn instead of fork+exec.
+    """
+    return {"close_fds": False, "executable": _which(argv[0]) if argv else None}
+
+def run_cmd(cmd: Argv, require_root: bool = False) -> str:
+    """Run a command (argv list, no shell) and return stdout (or prefixed error)."""
     try:
-        if require_root and os.geteuid() != 0:
-            cmd = f"sudo -n {cmd}"
-        result = subprocess.run(cmd, shell=True, text=True, capture_output=True, check=True)
-        return sanitize_cmd_output(result.stdout)
+        # Capture raw bytes and decode once; sanitize_cmd_output normalizes newlines.
+        argv = _argv(cmd, require_root)
+        result = subprocess.run(argv, stdin=subprocess.DEVNULL,
+                                capture_output=True, check=True, **_spawn_kw(argv))
+        return sanitize_cmd_output(result.stdout.decode("utf-8", errors="replace"))
     except subprocess.CalledProcessError as e:
-        return f"Error: {sanitize_cmd_output(e.stderr)}"
+        return f"Error: {sanitize_cmd_output(e.stderr.decode('utf-8', errors='replace'))}"
+    except OSError as e:
+        return f"Error: {e}"
+
+async def _exec_async(cmd: Argv, require_root: bool = False,
+                      cwd: Optional[str] = None) -> Tuple[Optional[int], bytes, bytes]:
+    """Spawn without a shell and collect raw (returncode, stdout, stderr); returncode None if spawn failed."""
+    argv = _argv(cmd, require_root)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdin=asyncio.subprocess.DEVNULL, cwd=cwd,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, **_spawn_kw(argv)
+        )
+    except OSError as e:
+        return None, b"", str(e).encode()
+    out, err = await proc.communicate()
+    return proc.returncode, out, err
+
+async def run_cmd_async(cmd: Argv, require_root: bool = False) -> str:
+    """asyncio counterpart of run_cmd (no shell; same 'Error: ...' contract)."""
+    rc, out, err = await _exec_async(cmd, require_root)
+    if rc != 0:
+        return f"Error: {sanitize_cmd_output(err.decode('utf-8', errors='replace'))}"
+    return sanitize_cmd_output(out.decode("utf-8", errors="replace"))
+
+_OUTPUT_CAP = 1 << 20  # default bytes kept from bulky command output (turbostat, telemetry-log)
+
+def _read_capped(f, max_bytes: int) -> bytes:
+    """Whole spooled file if it fits in max_bytes, else its head and tail around a marker."""
+    size = os.fstat(f.fileno()).st_size
+    f.seek(0)
+    if max_bytes <= 0 or size <= max_bytes:
+        return f.read()
+    half = max_bytes // 2
+    head = f.read(half)
+    f.seek(size - half)
+    return head + f"\n...[truncated {size - 2 * half} bytes]...\n".encode() + f.read(half)
+
+def run_cmd_capped(cmd: Argv, require_root: bool = False, max_bytes: int = _OUTPUT_CAP) -> str:
+    """
+    run_cmd for commands with potentially huge stdout: output is spooled to an
+    unlinked temp file and only max_bytes of it (head + tail) is ever read back.
+    """
+    argv = _argv(cmd, require_root)
+    with tempfile.TemporaryFile(prefix="nvmeqa_out_") as f:
+        try:
+            result = subprocess.run(argv, stdin=subprocess.DEVNULL, stdout=f,
+                                    stderr=subprocess.PIPE, **_spawn_kw(argv))
+        except OSError as e:
+            return f"Error: {e}"
+        if result.returncode != 0:
+            return f"Error: {sanitize_cmd_output(result.stderr.decode('utf-8', errors='replace'))}"
+        return sanitize_cmd_output(_read_capped(f, max_bytes).decode("utf-8", errors="replace"))
+
+async def run_cmd_capped_async(cmd: Argv, require_root: bool = False, max_bytes: int = _OUTPUT_CAP) -> str:
+    """asyncio counterpart of run_cmd_capped."""
+    argv = _argv(cmd, require_root)
+    with tempfile.TemporaryFile(prefix="nvmeqa_out_") as f:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *argv, stdin=asyncio.subprocess.DEVNULL, stdout=f,
+                stderr=asyncio.subprocess.PIPE, **_spawn_kw(argv)
+            )
+        except OSError as e:
+            return f"Error: {e}"
+        _out, err = await proc.communicate()
+        if proc.returncode != 0:
+            return f"Error: {sanitize_cmd_output(err.decode('utf-8', errors='replace'))}"
+        return sanitize_cmd_output(_read_capped(f, max_bytes).decode("utf-8", errors="replace"))
+
+class CmdWorker:
+    """
+    Long-lived bash coprocess that runs commands sent over stdin, amortizing
+    fork/exec (and sudo) across repeated SMART / power-state sampling.
+
+    Each command is framed with per-call end markers carrying the exit status;
+    stderr goes through a scratch file so stdout stays clean.
+    """
+
+    def __init__(self, require_root: bool = False):
+        argv = ["bash", "--noprofile", "--norc"]
+        if require_root and os.geteuid() != 0:
+            argv = ["sudo", "-n"] + argv
+        fd, self._err_path = tempfile.mkstemp(prefix="nvmeqa_worker_", suffix=".err")
+        os.close(fd)
+        self._proc = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL, **_spawn_kw(argv))
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def _read_until(self, marker: bytes) -> Tuple[bytes, str]:
+        chunks: List[bytes] = []
+        while True:
+            line = self._proc.stdout.readline()
+            if not line:
+                raise BrokenPipeError("command worker exited")
+            if line.startswith(marker):
+                return b"".join(chunks), line[len(marker):].decode().strip()
+            chunks.append(line)
+
+    def call(self, cmd: str) -> str:
+        """Same contract as run_cmd: sanitized stdout, or 'Error: <stderr>'."""
+        with self._lock:
+            self._seq += 1
+            end, err = f"::END::{self._seq}::", f"::ERR::{self._seq}::"
+            errf = shlex.quote(self._err_path)
+            script = (f"{{ {cmd}; }} </dev/null 2>{errf}; __rc=$?; echo; echo \"{end}$__rc\"; "
+                      f"cat {errf}; echo; echo \"{err}\"\n")
+            self._proc.stdin.write(script.encode())
+            self._proc.stdin.flush()
+            out, rc = self._read_until(end.encode())
+            errs, _ = self._read_until(err.encode())
+        if rc != "0":
+            return f"Error: {sanitize_cmd_output(errs.decode('utf-8', errors='replace'))}"
+        return sanitize_cmd_output(out.decode("utf-8", errors="replace"))
+
+    def close(self) -> None:
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=2)
+        except Exception:
+            self._proc.kill()
+        try:
+            os.unlink(self._err_path)
+        except OSError:
+            pass
+
+_WORKERS: Dict[bool, Optional[CmdWorker]] = {}
+_WORKERS_LOCK = threading.Lock()
+
+def run_cmd_hot(cmd: Argv, require_root: bool = False) -> str:
+    """run_cmd through a persistent CmdWorker; falls back to run_cmd if the worker is unusable."""
+    with _WORKERS_LOCK:
+        if require_root not in _WORKERS:
+            try:
+                _WORKERS[require_root] = CmdWorker(require_root)
+            except Exception:
+                _WORKERS[require_root] = None
+        worker = _WORKERS[require_root]
+    if worker is not None:
+        try:
+            return worker.call(cmd if isinstance(cmd, str) else shlex.join(cmd))
+        except (OSError, ValueError):
+            with _WORKERS_LOCK:
+                _WORKERS[require_root] = None
+            worker.close()
+    return run_cmd(cmd, require_root=require_root)
+
+@atexit.register
+def _close_workers() -> None:
+    for worker in _WORKERS.values():
+        if worker is not None:
+            worker.close()
 
 def read_sysfs(path: str) -> Optional[str]:
+    """Read a small sysfs attribute with raw os.open/os.read (no file object per call)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read().strip()
+        data = os.read(fd, 4096)
+        chunk = data
+        while chunk:  # sysfs answers in one read; the EOF read keeps other files correct
+            chunk = os.read(fd, 4096)
+            data += chunk
+        return data.decode("utf-8").strip()
     except Exception:
         return None
+    finally:
+        os.close(fd)
 
 def timestamp() -> str:
     return datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
 def time_hms() -> str:
-    return datetime.now().strftime("%H:%M:%S")
+    # Called once per monitor sample: time.strftime formats the C struct tm directly,
+    # without building a datetime object (~6x cheaper).
+    return time.strftime("%H:%M:%S")
 
 def kelvin_to_celsius(kelvin_temp: float) -> float:
     """Convert temperature from Kelvin to Celsius"""
@@ -195,49 +424,159 @@ def get_temperature_celsius(health_data: dict) -> float:
     
     return 0.0
 
-def b64_plot(fig) -> str:
+def b64_plot(fig, close: bool = True) -> str:
     buf = io.BytesIO()
     fig.savefig(buf, format="png")
-    plt.close(fig)
-    return base64.b64encode(buf.getvalue()).decode("utf-8")
+    if close:
+        fig.clear()
+    return base64.b64encode(buf.getbuffer()).decode("ascii")
+
+def svg_plot(fig) -> str:
+    """Render a Figure as inline <svg> markup: vector output, no rasterizing or base64."""
+    buf = io.StringIO()
+    fig.savefig(buf, format="svg")
+    s = buf.getvalue()
+    return s[s.find("<svg"):]
+
+def _encode_plot(fig, fmt: str) -> str:
+    """Payload for a reused Figure: inline SVG markup, or base64 PNG for fmt='png'."""
+    return svg_plot(fig) if fmt == "svg" else b64_plot(fig, close=False)
+
+def _img_html(payload: str) -> str:
+    return payload if payload.startswith("<svg") else f"<img src='data:image/png;base64,{payload}'/>"
+
+def _json_pointer(*parts: str) -> str:
+    """RFC 6901 pointer for a path of dict keys (device paths contain '/')."""
+    return "".join("/" + p.replace("~", "~0").replace("/", "~1") for p in parts)
+
+# Lazily fills <pre data-json-path="file#/pointer"> blocks when their <details> is opened.
+_JSON_VIEWER_JS = """<script>
+(function () {
+  var cache = {};
+  function load(file) {
+    if (!cache[file]) cache[file] = fetch(file).then(function (r) { return r.json(); });
+    return cache[file];
+  }
+  function resolve(obj, ptr) {
+    ptr.split("/").slice(1).forEach(function (k) {
+      k = k.replace(/~1/g, "/").replace(/~0/g, "~");
+      obj = (obj == null) ? undefined : obj[k];
+    });
+    return obj;
+  }
+  document.addEventListener("toggle", function (ev) {
+    var d = ev.target;
+    if (!d.open) return;
+    var pre = d.querySelector("pre[data-json-path]");
+    if (!pre || pre.dataset.loaded) return;
+    pre.dataset.loaded = "1";
+    var ref = pre.dataset.jsonPath, i = ref.indexOf("#");
+    var file = ref.slice(0, i), ptr = ref.slice(i + 1);
+    pre.textContent = "loading " + file + " ...";
+    load(file).then(function (j) {
+      var v = resolve(j, ptr);
+      pre.textContent = (typeof v === "string") ? v : JSON.stringify(v, null, 2);
+    }, function (e) {
+      pre.textContent = "Could not load " + file + " (" + e + "); open it from the report directory.";
+    });
+  }, true);
+})();
+</script>"""
+
+def _json_or_raw(raw: str) -> Any:
+    """Parse nvme-cli JSON output once; keep the raw text if it isn't JSON (e.g. 'Error: ...')."""
+    try:
+        return _json_loads(raw)
+    except Exception:
+        return raw
+
+def _json_default(o: Any) -> Any:
+    """json.dump hook: structured arrays become lists of records, other NumPy values plain Python."""
+    if isinstance(o, np.ndarray):
+        if o.dtype.names:
+            return [dict(zip(o.dtype.names, row)) for row in o.tolist()]
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+def _json_dump_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Encode to UTF-8 JSON (2-space indent or compact), via orjson when available."""
+    if HAVE_ORJSON:
+        try:
+            return orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib encoder handles them
+    if indent:
+        return json.dumps(obj, indent=2, default=_json_default).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=_json_default).encode("utf-8")
 
 def save_json(data: dict, filepath: str) -> None:
     Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    with open(filepath, "wb") as f:
+        f.write(_json_dump_bytes(data, indent=True))
 
-def html_escape(s: str) -> str:
+_ESCAPE_CACHE_MAX_LEN = 256  # only short, repetitive fragments are worth pinning in the cache
+
+def _html_escape(s: str) -> str:
     return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
+_html_escape_cached = lru_cache(maxsize=4096)(_html_escape)
+
+def html_escape(s: str) -> str:
+    """
+    Escape &, < and > for HTML text. Short strings (device paths, targets, small
+    values) repeat across a report and are memoized; large blobs are not.
+    """
+    return _html_escape_cached(s) if len(s) <= _ESCAPE_CACHE_MAX_LEN else _html_escape(s)
+
+def pretty_json_escaped(obj: Any) -> str:
+    """
+    2-space-indented JSON, HTML-escaped for a <pre>: one native encode (orjson when
+    available) plus one escape pass over the result.
+    """
+    return html_escape(_json_dump_bytes(obj, indent=True).decode("utf-8"))
+
+_PREVIEW_CHARS = 4096        # per telemetry text blob embedded in the HTML report
+_PREVIEW_SAMPLES = 16        # sensors samples embedded per workload
+
+def _preview(s: str, n: int = _PREVIEW_CHARS) -> str:
+    """Head + tail of a long string, with a marker for the elided middle."""
+    if len(s) <= n:
+        return s
+    half = n // 2
+    return f"{s[:half]}\n...[truncated {len(s) - 2 * half} bytes]...\n{s[-half:]}"
+
 # ============================
 # nvme-cli helpers (explicit)
 # ============================
 def nvme_list_json() -> Dict[str, Any]:
     """Wrapper for 'nvme list -o json' returning parsed JSON or {}."""
-    raw = run_cmd("nvme list -o json")
+    raw = run_cmd(["nvme", "list", "-o", "json"])
     try:
-        return json.loads(raw)
+        return _json_loads(raw)
     except Exception:
         return {}
 
-def list_nvme_devices_nvme_cli() -> Tuple[List[str], List[str]]:
+def list_nvme_devices_nvme_cli(j: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[str]]:
     """
-    Use nvme-cli to detect devices.
+    Use nvme-cli to detect devices (or an already-parsed 'nvme list' result `j`).
 
     Returns:
       (controllers, namespaces)
       controllers like ['/dev/nvme0', '/dev/nvme1']
       namespaces like ['/dev/nvme0n1', '/dev/nvme1n1', ...]
     """
-    j = nvme_list_json()
+    if j is None:
+        j = nvme_list_json()
     ctrls: set[str] = set()
     nss: List[str] = []
     for dev in j.get("Devices", []):
         dp = dev.get("DevicePath")
         if isinstance(dp, str) and dp.startswith("/dev/nvme"):
-            if re.search(r"n\d+$", dp):
+            if _NS_SUFFIX_RE.search(dp):
                 nss.append(dp)
-                ctrls.add(re.sub(r"n\d+$", "", dp))
+                ctrls.add(controller_from_ns(dp))
             else:
                 ctrls.add(dp)
     return sorted(ctrls), nss
@@ -247,55 +586,64 @@ def format_namespace_nvme_cli(ns: str, lbaf: int, ses: int) -> str:
     Explicit nvme-cli wrapper for formatting a namespace.
     Tries 'nvme format <ns>' first; if tool refuses, falls back to ctrl + NSID.
     """
-    out = run_cmd(f"nvme format {ns} --lbaf={lbaf} --ses={ses}", require_root=True)
+    out = run_cmd(["nvme", "format", ns, f"--lbaf={lbaf}", f"--ses={ses}"], require_root=True)
     if not out.startswith("Error:"):
         return out
     nsid = nsid_from_path(ns)
     ctrl = controller_from_ns(ns)
     if nsid is None:
         return out
-    out2 = run_cmd(f"nvme format {ctrl} -n {nsid} --lbaf={lbaf} --ses={ses}", require_root=True)
+    out2 = run_cmd(["nvme", "format", ctrl, "-n", str(nsid), f"--lbaf={lbaf}", f"--ses={ses}"],
+                   require_root=True)
     return out + (f"\nFallback(ctrl): {out2}" if out2 else "")
 
 # ============================
 # Discovery (now explicitly via nvme-cli)
 # ============================
+def _deep_merge(a: Dict[str, Any], b: Dict[str, Any]) -> None:
+    for k, v in b.items():
+        if isinstance(v, dict) and isinstance(a.get(k), dict):
+            _deep_merge(a[k], v)
+        else:
+            a[k] = v
+
+def _default_cfg() -> Dict[str, Any]:
+    """A private copy of DEFAULT_CFG: merging or later edits must never reach the defaults."""
+    return copy.deepcopy(DEFAULT_CFG)
+
 def load_config(path: Optional[str]) -> Dict[str, Any]:
     if not path:
-        return DEFAULT_CFG.copy()
+        return _default_cfg()
     p = Path(path)
     if not p.exists():
         print(f"[WARN] Config not found: {path}. Using defaults.")
-        return DEFAULT_CFG.copy()
+        return _default_cfg()
     try:
         if p.suffix.lower() in (".yml", ".yaml"):
             if not HAVE_YAML:
                 print("[WARN] pyyaml not installed; cannot parse YAML. Using defaults.")
-                return DEFAULT_CFG.copy()
+                return _default_cfg()
             with open(p, "r", encoding="utf-8") as f:
                 user_cfg = yaml.safe_load(f) or {}
         else:
-            with open(p, "r", encoding="utf-8") as f:
-                user_cfg = json.load(f)
+            with open(p, "rb") as f:
+                user_cfg = _json_loads(f.read())
     except Exception as e:
         print(f"[WARN] Failed to parse config: {e}. Using defaults.")
-        return DEFAULT_CFG.copy()
-
-    cfg = DEFAULT_CFG.copy()
-
-    def deep_merge(a, b):
-        for k, v in b.items():
-            if isinstance(v, dict) and isinstance(a.get(k), dict):
-                deep_merge(a[k], v)
-            else:
-                a[k] = v
+        return _default_cfg()
 
-    deep_merge(cfg, user_cfg)
+    cfg = _default_cfg()
+    _deep_merge(cfg, user_cfg)
     return cfg
 
+# include/exclude patterns come from config: compile each distinct one once per run.
+_filter_re = lru_cache(maxsize=64)(re.compile)
+
 def re_filter(values: List[str], include_regex: str, exclude_regex: str) -> List[str]:
-    inc = re.compile(include_regex) if include_regex else None
-    exc = re.compile(exclude_regex) if exclude_regex else None
+    if not exclude_regex and include_regex in ("", ".*"):
+        return list(values)  # default config: nothing to filter
+    inc = _filter_re(include_regex) if include_regex and include_regex != ".*" else None
+    exc = _filter_re(exclude_regex) if exclude_regex else None
     out: List[str] = []
     for v in values:
         if inc and not inc.search(v):
@@ -310,21 +658,45 @@ def list_all_namespaces() -> List[str]:
     _ctrls, nss = list_nvme_devices_nvme_cli()
     return nss
 
+_NS_SUFFIX_RE = re.compile(r"n\d+$")
+
+@lru_cache(maxsize=256)
 def controller_from_ns(ns: str) -> str:
-    return re.sub(r"n\d+$", "", ns)
+    return _NS_SUFFIX_RE.sub("", ns)
+
+_INVENTORY: Optional[Dict[str, Any]] = None
+
+def _nvme_inventory(refresh: bool = False) -> Dict[str, Any]:
+    """
+    Single 'nvme list' pass, grouped by controller and cached for the run.
+
+    Returns:
+      {"controllers": ['/dev/nvme0', ...],
+       "ns_by_ctrl":  {'/dev/nvme0': ['/dev/nvme0n1', ...], ...},
+       "list_json":   <parsed 'nvme list -o json'>}
+    """
+    global _INVENTORY
+    if _INVENTORY is None or refresh:
+        j = nvme_list_json()
+        ctrls, nss = list_nvme_devices_nvme_cli(j)
+        ns_by_ctrl: Dict[str, List[str]] = {c: [] for c in ctrls}
+        for ns in nss:
+            ns_by_ctrl.setdefault(controller_from_ns(ns), []).append(ns)
+        _INVENTORY = {"controllers": ctrls, "ns_by_ctrl": ns_by_ctrl, "list_json": j}
+    return _INVENTORY
 
 def list_nvme_controllers(cfg: Dict[str, Any]) -> List[str]:
     explicit = [c for c in cfg["controllers"].get("explicit", []) if isinstance(c, str)]
     if explicit:
         ctrls: List[str] = []
         for c in explicit:
-            ctrls.append(controller_from_ns(c) if re.search(r"n\d+$", c) else c)
+            ctrls.append(controller_from_ns(c) if _NS_SUFFIX_RE.search(c) else c)
         seen, result = set(), []
         for c in ctrls:
             if c not in seen:
                 result.append(c); seen.add(c)
         return result
-    ctrls, _nss = list_nvme_devices_nvme_cli()
+    ctrls = _nvme_inventory()["controllers"]
     return re_filter(ctrls, cfg["controllers"]["include_regex"], cfg["controllers"]["exclude_regex"])
 
 def list_nvme_namespaces(ctrl: str, cfg: Dict[str, Any]) -> List[str]:
@@ -332,8 +704,7 @@ def list_nvme_namespaces(ctrl: str, cfg: Dict[str, Any]) -> List[str]:
     if explicit_ns:
         sel = [n for n in explicit_ns if controller_from_ns(n) == ctrl]
         return re_filter(sel, cfg["namespaces"]["include_regex"], cfg["namespaces"]["exclude_regex"])
-    _ctrls, all_ns = list_nvme_devices_nvme_cli()
-    sel = [ns for ns in all_ns if controller_from_ns(ns) == ctrl]
+    sel = _nvme_inventory()["ns_by_ctrl"].get(ctrl, [])
     return re_filter(sel, cfg["namespaces"]["include_regex"], cfg["namespaces"]["exclude_regex"])
 
 # ============================
@@ -355,52 +726,57 @@ def _safe_nvme_list_subsys(ctrl: str) -> str:
       2) If error, ensure '/dev/' prefix and retry.
       3) If error, list all: nvme list-subsys -o json
       4) If still error, last resort: nvme list-subsys (text)
+
+    Each attempt is its own call on the persistent command worker (no fresh
+    subprocess round-trip), and only the output of the attempt that succeeded is
+    returned, so a partly printed failed attempt never leaks into the result.
     """
-    out = run_cmd(f"nvme list-subsys -o json {ctrl}")
-    if not out.startswith("Error:"):
-        return out
     ctrl_norm = _normalize_ctrl_path(ctrl)
+    attempts = [["nvme", "list-subsys", "-o", "json", ctrl]]
     if ctrl_norm != ctrl:
-        out2 = run_cmd(f"nvme list-subsys -o json {ctrl_norm}")
-        if not out2.startswith("Error:"):
-            return out2
-    out3 = run_cmd("nvme list-subsys -o json")
-    if not out3.startswith("Error:"):
-        return out3
-    return run_cmd("nvme list-subsys")
-
+        attempts.append(["nvme", "list-subsys", "-o", "json", ctrl_norm])
+    attempts.append(["nvme", "list-subsys", "-o", "json"])
+    for argv in attempts:
+        out = run_cmd_hot(argv)
+        if not out.startswith("Error:"):
+            return out
+    return run_cmd_hot(["nvme", "list-subsys"])
+
+_BDF_RE = re.compile(r"[0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7]")
+_PCI_SLOT_RE = re.compile(r"PCI_SLOT_NAME=([0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7])")
+# What a failed BDF lookup saw (sysfs nodes, udevadm path), keyed by ctrl; the device-info
+# debug section reuses it instead of probing again.
+_BDF_MISSES: Dict[str, Dict[str, Any]] = {}
+
+@lru_cache(maxsize=None)
 def get_pci_bdf_for_ctrl(ctrl: str) -> Optional[str]:
     """
-    Resolve the PCI BDF for a controller like '/dev/nvme1'.
+    Resolve the PCI BDF for a controller like '/dev/nvme1' (memoized: the topology
+    doesn't change during a run, so the sysfs climb / udevadm fallback runs once).
 
     Accepts hex for bus/device (e.g., '0000:da:00.0').
 
     Strategy:
-      1) Start from /sys/class/nvme/<name>/device (realpath) and climb up.
-      2) While climbing, look for a BDF-like basename, or parse PCI_SLOT_NAME from 'uevent'.
+      1) Read /sys/class/nvme/<name>/address (PCIe transports expose the BDF there), then
+         PCI_SLOT_NAME from <name>/device/uevent: one small read each.
+      2) Resolve /sys/class/nvme/<name>/device and scan the realpath for a BDF. The kernel
+         nests PCI devices by BDF, so this answers standard layouts with no file I/O.
+         Otherwise climb up, parsing PCI_SLOT_NAME from each level's 'uevent'.
       3) If needed, use 'udevadm info --query=path --name=<ctrl>' to get the sysfs node and repeat.
-      4) Fallback: scan the absolute path string for a BDF substring.
     """
     name = os.path.basename(ctrl)  # e.g. 'nvme1'
-    bdf_re_full = re.compile(r"[0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7]")
-    bdf_re_base = re.compile(r"^[0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7]$")
-
-    def find_in_path(p: str) -> Optional[str]:
-        m = bdf_re_full.search(p)
-        return m.group(0) if m else None
 
     def climb_for_bdf(start_path: str) -> Optional[str]:
         p = os.path.realpath(start_path)
-        bdf = find_in_path(p)
-        if bdf:
-            return bdf
+        # Every ancestor is a prefix of p, so one scan covers all BDF-named levels; the
+        # deepest one is the endpoint itself (earlier ones are root ports / switches).
+        found = _BDF_RE.findall(p)
+        if found:
+            return found[-1]
         for _ in range(12):
-            base = os.path.basename(p)
-            if bdf_re_base.fullmatch(base):
-                return base
             uevent = read_sysfs(os.path.join(p, "uevent"))
             if uevent:
-                m = re.search(r"PCI_SLOT_NAME=([0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7])", uevent)
+                m = _PCI_SLOT_RE.search(uevent)
                 if m:
                     return m.group(1)
             parent = os.path.dirname(p)
@@ -409,40 +785,77 @@ def get_pci_bdf_for_ctrl(ctrl: str) -> Optional[str]:
             p = parent
         return None
 
+    addr = read_sysfs(f"/sys/class/nvme/{name}/address")
+    if addr and _BDF_RE.fullmatch(addr):
+        return addr
+    uevent = read_sysfs(f"/sys/class/nvme/{name}/device/uevent")
+    if uevent:
+        m = _PCI_SLOT_RE.search(uevent)
+        if m:
+            return m.group(1)
+
     sys_node = f"/sys/class/nvme/{name}/device"
-    if os.path.exists(sys_node):
+    dev_exists = os.path.exists(sys_node)
+    if dev_exists:
         bdf = climb_for_bdf(sys_node)
         if bdf:
             return bdf
 
+    rel = None
     if cmd_exists("udevadm"):
-        rel = run_cmd(f"udevadm info --query=path --name={shlex.quote(ctrl)}")
+        rel = run_cmd(["udevadm", "info", "--query=path", f"--name={ctrl}"])
         if rel and not rel.startswith("Error:"):
-            abs_path = os.path.realpath(os.path.join("/sys", rel.lstrip("/")))
-            bdf = climb_for_bdf(abs_path)
-            if bdf:
-                return bdf
-            bdf = find_in_path(abs_path)
+            bdf = climb_for_bdf(os.path.join("/sys", rel.lstrip("/")))
             if bdf:
                 return bdf
 
+    _BDF_MISSES[ctrl] = {
+        "sysfs_exists": {
+            "/sys/class/nvme/<name>": dev_exists or os.path.exists(f"/sys/class/nvme/{name}"),
+            "/sys/class/nvme/<name>/device": dev_exists,
+        },
+        "udevadm_path": rel,
+    }
     return None
 
-def get_device_info(ctrl: str) -> Dict[str, Any]:
+_PCI_SYSFS_ATTRS = (
+    "current_link_speed", "current_link_width", "max_link_speed", "max_link_width",
+    "vendor", "device", "subsystem_vendor", "subsystem_device", "numa_node", "irq",
+)
+
+def read_pci_sysfs(bdf: str) -> Dict[str, Optional[str]]:
+    """Batch-read link/identity attributes from /sys/bus/pci/devices/<bdf> in one directory scan."""
+    out: Dict[str, Optional[str]] = dict.fromkeys(_PCI_SYSFS_ATTRS)
+    try:
+        with os.scandir(f"/sys/bus/pci/devices/{bdf}") as it:
+            for entry in it:
+                if entry.name in out:
+                    out[entry.name] = read_sysfs(entry.path)
+    except OSError:
+        pass
+    return out
+
+async def get_device_info_async(ctrl: str, cfg: Optional[Dict[str, Any]] = None,
+                                nvme_list: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Per-controller info; pass `nvme_list` to reuse an existing 'nvme list' snapshot.
+    The independent nvme-cli/lspci/udevadm probes are spawned together and awaited as a batch.
+    """
     ctrl_norm = _normalize_ctrl_path(ctrl)
     info: Dict[str, Any] = {"controller": ctrl_norm}
     bdf = get_pci_bdf_for_ctrl(ctrl_norm)
     info["pci_bdf"] = bdf or "unknown"
 
+    probes: Dict[str, Any] = {}
     if bdf:
-        base = f"/sys/bus/pci/devices/{bdf}"
-        info["pcie_sysfs"] = {
-            "current_link_speed": read_sysfs(f"{base}/current_link_speed"),
-            "current_link_width": read_sysfs(f"{base}/current_link_width"),
-            "max_link_speed": read_sysfs(f"{base}/max_link_speed"),
-            "max_link_width": read_sysfs(f"{base}/max_link_width"),
-        }
-        info["lspci_vv"] = run_cmd(f"lspci -s {bdf} -vv")
+        info["pcie_sysfs"] = read_pci_sysfs(bdf)
+        if (cfg or DEFAULT_CFG)["telemetry"].get("lspci_vv", False):
+            probes["lspci_vv"] = run_cmd_async(["lspci", "-s", bdf, "-vv"])
+    elif ctrl_norm in _BDF_MISSES:
+        miss = _BDF_MISSES[ctrl_norm]
+        info["debug_sysfs_exists"] = miss["sysfs_exists"]
+        if miss["udevadm_path"] is not None:
+            info["debug_udevadm_path"] = miss["udevadm_path"]
     else:
         name = os.path.basename(ctrl_norm)
         info["debug_sysfs_exists"] = {
@@ -450,18 +863,42 @@ def get_device_info(ctrl: str) -> Dict[str, Any]:
             "/sys/class/nvme/<name>/device": os.path.exists(f"/sys/class/nvme/{name}/device"),
         }
         if cmd_exists("udevadm"):
-            info["debug_udevadm_path"] = run_cmd(f"udevadm info --query=path --name={shlex.quote(ctrl_norm)}")
-
-    info["nvme_id_ctrl_json"] = run_cmd(f"nvme id-ctrl -o json {ctrl_norm}")
-    info["nvme_list_subsys"] = _safe_nvme_list_subsys(ctrl_norm)
-    info["nvme_list_json"] = run_cmd("nvme list -o json")
+            probes["debug_udevadm_path"] = run_cmd_async(["udevadm", "info", "--query=path", f"--name={ctrl_norm}"])
+
+    probes["nvme_id_ctrl_json"] = run_cmd_async(["nvme", "id-ctrl", "-o", "json", ctrl_norm])
+    # list-subsys retries with fallbacks, one after another; keep that off the loop thread.
+    probes["nvme_list_subsys"] = asyncio.to_thread(_safe_nvme_list_subsys, ctrl_norm)
+    if nvme_list is None:
+        probes["nvme_list_json"] = run_cmd_async(["nvme", "list", "-o", "json"])
+    outs = dict(zip(probes, await asyncio.gather(*probes.values())))
+
+    for key in ("lspci_vv", "debug_udevadm_path"):
+        if key in outs:
+            info[key] = outs[key]
+    # Store parsed objects so the reports nest them instead of re-escaping JSON text.
+    info["nvme_id_ctrl_json"] = _json_or_raw(outs["nvme_id_ctrl_json"])
+    info["nvme_list_subsys"] = _json_or_raw(outs["nvme_list_subsys"])
+    info["nvme_list_json"] = nvme_list if nvme_list is not None else _json_or_raw(outs["nvme_list_json"])
     return info
 
+def get_device_info(ctrl: str, cfg: Optional[Dict[str, Any]] = None,
+                    nvme_list: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return asyncio.run(get_device_info_async(ctrl, cfg, nvme_list))
+
+async def collect_device_info(ctrls: List[str], cfg: Dict[str, Any],
+                              nvme_list: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """Device info for several controllers in one event-loop batch."""
+    infos = await asyncio.gather(*(get_device_info_async(c, cfg, nvme_list) for c in ctrls))
+    return dict(zip(ctrls, infos))
+
 # ============================
 # Provisioning Hooks
 # ============================
+_NSID_RE = re.compile(r"n(\d+)$")
+
+@lru_cache(maxsize=256)
 def nsid_from_path(ns: str) -> Optional[int]:
-    m = re.search(r"n(\d+)$", ns)
+    m = _NSID_RE.search(ns)
     return int(m.group(1)) if m else None
 
 def format_namespace(ns: str, lbaf: int, ses: int, wait_after: int = 5) -> str:
@@ -471,6 +908,28 @@ def format_namespace(ns: str, lbaf: int, ses: int, wait_after: int = 5) -> str:
         time.sleep(wait_after)
     return out
 
+_SSTAT_IN_PROGRESS = 2  # Sanitize Status (SSTAT) bits 2:0: most recent sanitize still running
+_SSTAT_STR_RE = re.compile(r"\s*\(?\s*(\d+)\s*\)?")  # nvme-cli prints e.g. "(2) Sanitize in Progress."
+
+def parse_sanitize_state(log: Any) -> Optional[int]:
+    """SSTAT status (bits 2:0) from parsed `nvme sanitize-log -o json` output, or None."""
+    if not isinstance(log, dict):
+        return None
+    if "sstat" not in log and len(log) == 1:
+        log = next(iter(log.values()))  # the log is nested under the device name
+    sstat = log.get("sstat") if isinstance(log, dict) else None
+    if isinstance(sstat, dict):
+        sstat = sstat.get("status")
+    if isinstance(sstat, str):
+        m = _SSTAT_STR_RE.match(sstat)
+        sstat = int(m.group(1)) if m else None
+    return sstat & 0x7 if isinstance(sstat, int) else None
+
+def sanitize_state(ctrl: str) -> Optional[int]:
+    """SSTAT status field from the Sanitize Status log (0x81), or None if unreadable."""
+    return parse_sanitize_state(
+        _json_or_raw(run_cmd(["nvme", "sanitize-log", ctrl, "-o", "json"], require_root=True)))
+
 def sanitize_controller(ctrl: str, action: str, ause: bool, owpass: int, interval: int, timeout: int) -> str:
     if action == "none":
         return "sanitize: skipped"
@@ -478,19 +937,24 @@ def sanitize_controller(ctrl: str, action: str, ause: bool, owpass: int, interva
     code = sanact_map.get(action, 0)
     if code == 0:
         return f"sanitize: invalid action '{action}'"
-    args = [f"nvme sanitize {ctrl} --sanact={code}"]
+    args = ["nvme", "sanitize", ctrl, f"--sanact={code}"]
     if ause:
         args.append("--ause=1")
     if action == "overwrite":
         args.append(f"--owpass={owpass}")
-    out = run_cmd(" ".join(args), require_root=True)
-    start = time.time()
-    while time.time() - start < timeout:
-        status = run_cmd(f"nvme get-log {ctrl} --log-id=0x81 --log-len=512", require_root=True)
-        if "Error:" in status:
-            time.sleep(interval)
+    out = run_cmd(args, require_root=True)
+    # Poll the sanitize status log until the operation leaves the in-progress state,
+    # backing off from `interval` up to 30 s between probes (sanitize runs for minutes).
+    deadline = time.monotonic() + timeout
+    wait = float(max(interval, 1))
+    while time.monotonic() < deadline:
+        time.sleep(max(0.0, min(wait, deadline - time.monotonic())))
+        state = sanitize_state(ctrl)
+        # Unreadable/unparseable log: keep waiting until the deadline rather than
+        # letting format/mkfs/fio start on a controller that may still be sanitizing.
+        if state is not None and state != _SSTAT_IN_PROGRESS:
             break
-        time.sleep(interval)
+        wait = min(wait * 1.5, max(30.0, float(interval)))
     return out
 
 def set_namespace_write_protect(ns: str, value: int) -> str:
@@ -498,47 +962,201 @@ def set_namespace_write_protect(ns: str, value: int) -> str:
     ctrl = controller_from_ns(ns)
     if nsid is None:
         return "write-protect: cannot parse NSID"
-    return run_cmd(f"nvme set-feature {ctrl} -n {nsid} -f 0x82 -v {value}", require_root=True)
+    return run_cmd(["nvme", "set-feature", ctrl, "-n", str(nsid), "-f", "0x82", "-v", str(value)],
+                   require_root=True)
 
 def create_filesystem(ns: str, fs_type: str, mkfs_options: str) -> str:
-    return run_cmd(f"mkfs.{shlex.quote(fs_type)} {mkfs_options} {shlex.quote(ns)}", require_root=True)
+    return run_cmd([f"mkfs.{fs_type}", *shlex.split(mkfs_options), ns], require_root=True)
 
 def mount_namespace(ns: str, mount_base: str, mount_options: str) -> Tuple[str, str]:
     mp = os.path.join(mount_base, os.path.basename(ns))
     Path(mp).mkdir(parents=True, exist_ok=True)
-    out = run_cmd(f"mount -o {shlex.quote(mount_options)} {shlex.quote(ns)} {shlex.quote(mp)}", require_root=True)
+    out = run_cmd(["mount", "-o", mount_options, ns, mp], require_root=True)
     return mp, out
 
 def unmount_path(mountpoint: str) -> str:
-    return run_cmd(f"umount {shlex.quote(mountpoint)}", require_root=True)
+    return run_cmd(["umount", mountpoint], require_root=True)
 
 # ============================
 # SMART & Power Monitoring
 # ============================
-def get_nvme_health(ns: str) -> str:
-    return run_cmd(f"nvme smart-log -o json {ns}")
-
-def monitor_smart(ns: str, interval: int, duration: int) -> List[Dict[str, Any]]:
-    logs: List[Dict[str, Any]] = []
-    start = time.time()
-    while time.time() - start < duration:
+def get_nvme_health(ns: str, worker: Optional[CmdWorker] = None) -> str:
+    """SMART log via `worker` when given (e.g. a per-namespace monitor), else the shared hot worker."""
+    cmd = ["nvme", "smart-log", "-o", "json", ns]
+    if worker is not None:
         try:
-            raw = get_nvme_health(ns)
-            j = json.loads(raw)
-            logs.append({
-                "time": time_hms(),
-                "temperature": get_temperature_celsius(j),
-                "percentage_used": j.get("percentage_used", 0),
-                "media_errors": j.get("media_errors", 0),
-                "critical_warnings": j.get("critical_warning", 0),
-            })
-        except Exception:
+            return worker.call(shlex.join(cmd))
+        except (OSError, ValueError):
             pass
-        time.sleep(interval)
-    return logs
+    return run_cmd_hot(cmd)
+
+# Columnar (structured) layout for SMART samples: one typed column per metric.
+# Media errors is a 128-bit counter, so that column holds Python ints (no u8 overflow).
+SMART_DTYPE = np.dtype([
+    ("time", "U8"),
+    ("temperature", "f8"),
+    ("percentage_used", "u2"),
+    ("media_errors", "O"),
+    ("critical_warnings", "u4"),
+])
+
+def _next_tick(prev: float, interval: float) -> float:
+    """
+    Next monotonic deadline on a fixed-rate sampling grid. Slow samples don't shift
+    the grid; ticks already missed are skipped rather than fired back-to-back.
+    """
+    tick = prev + interval
+    now = time.monotonic()
+    if interval > 0 and tick < now:
+        tick += math.ceil((now - tick) / interval) * interval
+    return tick
+
+# struct nvme_passthru_cmd (linux/nvme_ioctl.h) and NVME_IOCTL_ADMIN_CMD = _IOWR('N', 0x41, <72 bytes>)
+_NVME_ADMIN_CMD = struct.Struct("<BBHIIIQQII6III")
+_NVME_IOCTL_ADMIN_CMD = (3 << 30) | (_NVME_ADMIN_CMD.size << 16) | (ord("N") << 8) | 0x41
+_SMART_LOG_LEN = 512
+# SMART / Health log fields: critical warning @0, composite temp (K) @1, percentage used @5;
+# media errors is a 128-bit counter @160.
+_SMART_HEAD = struct.Struct("<BH2xB")
+_SMART_U128 = struct.Struct("<QQ")
+
+def _decode_smart_log(page: Any) -> Dict[str, Any]:
+    """The fields monitor_smart keeps from a raw 512-byte SMART log, keyed like nvme-cli's JSON."""
+    crit, temp_k, pct = _SMART_HEAD.unpack_from(page, 0)
+    lo, hi = _SMART_U128.unpack_from(page, 160)
+    return {
+        "critical_warning": crit,
+        "temperature": temp_k,  # Kelvin, as nvme-cli reports it
+        "percentage_used": pct,
+        "media_errors": lo | (hi << 64),
+    }
+
+class NvmeAdmin:
+    """
+    NVMe admin commands through the passthrough ioctl on one open fd, instead of
+    fork+exec of nvme-cli (and parsing its output) per sample. Needs CAP_SYS_ADMIN;
+    falsy when the device can't be opened or has been disabled. Commands raise OSError
+    on ioctl failure or a non-zero NVMe status so callers can fall back to nvme-cli.
+    Shared instances come from nvme_admin().
+    """
+    def __init__(self, dev: str):
+        self._log = (ctypes.c_ubyte * _SMART_LOG_LEN)()
+        self._ok = True
+        try:
+            self._fd: Optional[int] = os.open(dev, os.O_RDONLY)
+        except OSError:
+            self._fd = None
+
+    def __bool__(self) -> bool:
+        return self._ok and self._fd is not None
+
+    def disable(self) -> None:
+        """Stop using passthrough (e.g. EPERM). The fd stays open until close(), so
+        a concurrent user of a shared handle never ioctls a recycled fd number."""
+        self._ok = False
+
+    def call(self, opcode: int, nsid: int = 0, cdw10: int = 0, addr: int = 0, data_len: int = 0) -> int:
+        """Issue one admin command; returns completion dword 0 (nvme_passthru_cmd.result)."""
+        cmd = bytearray(_NVME_ADMIN_CMD.pack(opcode, 0, 0, nsid, 0, 0, 0, addr, 0, data_len,
+                                             cdw10, 0, 0, 0, 0, 0, 0, 0))
+        status = fcntl.ioctl(self._fd, _NVME_IOCTL_ADMIN_CMD, cmd)
+        if status:
+            raise OSError(f"admin opcode 0x{opcode:02x} failed: NVMe status 0x{status:x}")
+        return _NVME_ADMIN_CMD.unpack(cmd)[-1]
+
+    def smart_log(self) -> Dict[str, Any]:
+        """Get Log Page (0x02), LID 0x02, keyed like `nvme smart-log -o json`."""
+        # NSID 0xFFFFFFFF = controller-wide log (nvme-cli's default); NUMDL = dwords - 1.
+        self.call(0x02, 0xFFFFFFFF, 0x02 | ((_SMART_LOG_LEN // 4 - 1) << 16),
+                  ctypes.addressof(self._log), _SMART_LOG_LEN)
+        return _decode_smart_log(self._log)
+
+    def power_management(self) -> Dict[str, Any]:
+        """Get Features (0x0A), FID 0x02 current value, decoded like `nvme get-feature -f 2 -H`."""
+        val = self.call(0x0A, 0, 0x02)
+        return {"value": val, "power_state": val & 0x1F, "workload_hint": (val >> 5) & 0x7}
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+_ADMIN: Dict[str, NvmeAdmin] = {}
+_ADMIN_LOCK = threading.Lock()
+
+def nvme_admin(dev: str) -> NvmeAdmin:
+    """
+    Shared NvmeAdmin for a controller/namespace node, opened on first use and kept for
+    the run: monitors across workloads and namespaces reuse the fd instead of reopening.
+    """
+    with _ADMIN_LOCK:
+        handle = _ADMIN.get(dev)
+        if handle is None:
+            handle = _ADMIN[dev] = NvmeAdmin(dev)
+        return handle
+
+@atexit.register
+def _close_admin() -> None:
+    for handle in _ADMIN.values():
+        handle.close()
+
+def monitor_smart(ns: str, interval: int, duration: int) -> np.ndarray:
+    """
+    Sample SMART health into a preallocated SMART_DTYPE array; returns the filled prefix.
+    Columns are views (logs["temperature"]); JSON output still gets one record per sample.
+
+    Samples come from the admin passthrough ioctl when permitted. Otherwise each monitor
+    owns one long-lived CmdWorker for its whole window, so concurrent namespaces neither
+    respawn a shell per sample nor queue on the shared worker's lock.
+    """
+    logs = np.empty(max(1, math.ceil(duration / max(interval, 1))), dtype=SMART_DTYPE)
+    direct = nvme_admin(ns)
+    worker: Optional[CmdWorker] = None
+    spawned = False
+
+    def read_health() -> Dict[str, Any]:
+        nonlocal worker, spawned
+        if direct:
+            try:
+                return direct.smart_log()
+            except OSError:
+                direct.disable()  # no permission / not passthrough-capable: use nvme-cli from here on
+        if not spawned:
+            spawned = True
+            try:
+                worker = CmdWorker()
+            except Exception:
+                worker = None
+        return _json_loads(get_nvme_health(ns, worker))
+
+    n = 0
+    tick = time.monotonic()
+    deadline = tick + duration
+    try:
+        while tick < deadline and n < len(logs):
+            try:
+                j = read_health()
+                logs[n] = (
+                    time_hms(),
+                    get_temperature_celsius(j),
+                    j.get("percentage_used", 0),
+                    int(j.get("media_errors", 0)),
+                    j.get("critical_warning", 0),
+                )
+                n += 1
+            except Exception:
+                pass
+            tick = _next_tick(tick, interval)
+            time.sleep(max(0.0, min(tick, deadline) - time.monotonic()))
+    finally:
+        if worker is not None:
+            worker.close()
+    return logs[:n]
+
+_PWR_RE = re.compile(r"Current value:\s*(0x[0-9A-Fa-f]+|\d+)")
 
 def parse_power_value(txt: str) -> Optional[int]:
-    m = re.search(r"Current value:\s*(0x[0-9A-Fa-f]+|\d+)", txt)
+    m = _PWR_RE.search(txt)
     if not m:
         return None
     token = m.group(1)
@@ -547,169 +1165,451 @@ def parse_power_value(txt: str) -> Optional[int]:
     except Exception:
         return None
 
+def get_feature_value(ctrl: str, fid: int) -> Optional[int]:
+    """Current value of feature `fid` via 'nvme get-feature', or None if unreadable."""
+    out = run_cmd(["nvme", "get-feature", ctrl, "-f", str(fid)], require_root=True)
+    return None if out.startswith("Error:") else parse_power_value(out)
+
+def set_feature_value(ctrl: str, fid: int, value: int) -> str:
+    return run_cmd(["nvme", "set-feature", ctrl, "-f", str(fid), "-v", hex(value)], require_root=True)
+
+_FID_IRQ_COALESCING = 0x08  # CDW11: bits 7:0 aggregation threshold (0's based), 15:8 time (100 us units)
+
 def get_power_state_value(ctrl: str) -> Dict[str, Any]:
-    out = run_cmd(f"nvme get-feature {ctrl} -f 2 -H", require_root=True)
+    out = run_cmd_hot(["nvme", "get-feature", ctrl, "-f", "2", "-H"], require_root=True)
     if out.startswith("Error:"):
         return {"error": out}
     val = parse_power_value(out)
     return {"value": val, "raw": out}
 
-def power_monitor(ctrl: str, interval: int, duration: int) -> List[Dict[str, Any]]:
+async def power_monitor(ctrl: str, interval: int, duration: int) -> List[Dict[str, Any]]:
     series: List[Dict[str, Any]] = []
-    start = time.time()
-    while time.time() - start < duration:
-        rec = get_power_state_value(ctrl)
+    # Get Features via the admin ioctl is a microsecond syscall, fine on the loop thread.
+    direct = nvme_admin(ctrl)
+    tick = time.monotonic()
+    deadline = tick + duration
+    while tick < deadline:
+        rec = None
+        if direct:
+            try:
+                rec = direct.power_management()
+            except OSError:
+                direct.disable()  # fall back to nvme-cli from here on
+        if rec is None:
+            # get-feature goes through the persistent CmdWorker, which is blocking I/O.
+            rec = await asyncio.to_thread(get_power_state_value, ctrl)
         rec["time"] = time_hms()
         series.append(rec)
-        time.sleep(interval)
+        tick = _next_tick(tick, interval)
+        await asyncio.sleep(max(0.0, min(tick, deadline) - time.monotonic()))
     return series
 
 # ============================
 # Telemetry helpers
 # ============================
-def sensors_once() -> Any:
+async def sensors_once() -> Any:
     if not cmd_exists("sensors"):
         return "Error: sensors not found (install lm-sensors)"
-    return run_cmd("sensors -j")
+    return await run_cmd_async(["sensors", "-j"])
 
-def sensors_monitor(interval: int, duration: int) -> List[Any]:
+class HwmonTemps:
+    """
+    Direct hwmon reader: opens every /sys/class/hwmon/hwmon*/temp*_input once and
+    pread()s them per sample, instead of fork+exec of `sensors -j` each interval.
+    Samples are shaped like `sensors -j`: {chip: {label: {"tempN_input": degC}}}.
+    """
+    def __init__(self, root: str = "/sys/class/hwmon"):
+        self._fds: List[Tuple[str, str, str, int]] = []
+        try:
+            hwmons = sorted((e for e in os.scandir(root) if e.name.startswith("hwmon")), key=lambda e: e.name)
+        except OSError:
+            hwmons = []
+        for hw in hwmons:
+            chip = f"{read_sysfs(os.path.join(hw.path, 'name')) or 'hwmon'}-{hw.name}"
+            try:
+                inputs = sorted(e.name for e in os.scandir(hw.path)
+                                if e.name.startswith("temp") and e.name.endswith("_input"))
+            except OSError:
+                continue
+            for attr in inputs:
+                base = attr[:-len("_input")]
+                label = read_sysfs(os.path.join(hw.path, f"{base}_label")) or base
+                try:
+                    self._fds.append((chip, label, attr, os.open(os.path.join(hw.path, attr), os.O_RDONLY)))
+                except OSError:
+                    pass
+
+    def __bool__(self) -> bool:
+        return bool(self._fds)
+
+    def sample(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for chip, label, attr, fd in self._fds:
+            try:
+                value: Any = int(os.pread(fd, 16, 0)) / 1000.0
+            except (OSError, ValueError):
+                value = None
+            out.setdefault(chip, {})[label] = {attr: value}
+        return out
+
+    def close(self) -> None:
+        for *_, fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+async def sensors_monitor(interval: int, duration: int, source: str = "sysfs") -> List[Any]:
     out: List[Any] = []
-    start = time.time()
-    while time.time() - start < duration:
-        out.append(sensors_once())
-        time.sleep(interval)
+    hwmon = HwmonTemps() if source == "sysfs" else None
+    try:
+        tick = time.monotonic()
+        deadline = tick + duration
+        while tick < deadline:
+            # Fall back to lm-sensors when the kernel exposes no hwmon temperatures.
+            out.append(hwmon.sample() if hwmon else await sensors_once())
+            tick = _next_tick(tick, interval)
+            await asyncio.sleep(max(0.0, min(tick, deadline) - time.monotonic()))
+    finally:
+        if hwmon is not None:
+            hwmon.close()
     return out
 
-def turbostat_run(duration: int, interval: int) -> str:
+async def turbostat_run(duration: int, interval: int, max_bytes: int = _OUTPUT_CAP) -> str:
     if not cmd_exists("turbostat"):
         return "Error: turbostat not found (install linux-tools-common and linux-tools-$(uname -r))"
     iters = max(1, math.ceil(duration / max(1, interval)))
-    cmd = f"turbostat --quiet --interval {interval} --num_iterations {iters} --Summary"
-    return run_cmd(cmd, require_root=True)
+    cmd = ["turbostat", "--quiet", "--interval", str(interval), "--num_iterations", str(iters), "--Summary"]
+    return await run_cmd_capped_async(cmd, require_root=True, max_bytes=max_bytes)
 
-def nvme_telemetry_log(ctrl: str) -> str:
-    return run_cmd(f"nvme telemetry-log {ctrl} -o json", require_root=True)
+def nvme_telemetry_log(ctrl: str, max_bytes: int = _OUTPUT_CAP) -> str:
+    return run_cmd_capped(["nvme", "telemetry-log", ctrl, "-o", "json"], require_root=True, max_bytes=max_bytes)
 
 # ============================
 # fio
 # ============================
-def run_fio_test(target: str, rw: str, runtime: int, iodepth: int, bs: str,
-                 ioengine: str, on_fs: bool = False, file_size: Optional[str] = None) -> Dict[str, Any]:
-    base = (
-        f"fio --name=nvme_test --filename={shlex.quote(target)} "
-        f"--rw={rw} --bs={bs} --iodepth={iodepth} --runtime={runtime} "
-        f"--time_based=1 --ioengine={ioengine} --output-format=json"
-    )
-    if on_fs and file_size:
-        base += f" --size={file_size}"
-    raw = run_cmd(base)
+def fio_engine_opts(fio_cfg: Dict[str, Any], on_fs: bool = False) -> List[str]:
+    """
+    I/O path tuning as fio "key=value" options: O_DIRECT, plus io_uring tuning.
+    fixedbufs needs RLIMIT_MEMLOCK headroom; sqthread_poll needs root on older kernels;
+    hipri (polled completions) only applies to O_DIRECT on a raw namespace and needs
+    nvme poll queues (nvme.poll_queues=N).
+    """
+    direct = bool(fio_cfg.get("direct", True))
+    opts = ["direct=1"] if direct else []
+    if str(fio_cfg.get("ioengine", "io_uring")) != "io_uring":
+        return opts
+    uring = fio_cfg.get("io_uring", {}) or {}
+    depth = max(1, min(int(fio_cfg["iodepth"]), int(uring.get("batch", 32))))
+    opts += [
+        f"iodepth_batch_submit={depth}",
+        "iodepth_batch_complete_min=1",
+        f"iodepth_batch_complete_max={depth}",
+    ]
+    if uring.get("fixedbufs", True):
+        opts.append("fixedbufs=1")
+    if uring.get("registerfiles", True):
+        opts.append("registerfiles=1")
+    if uring.get("sqthread_poll", False):
+        opts.append("sqthread_poll=1")
+    if uring.get("hipri", False) and direct and not on_fs:
+        opts.append("hipri=1")
+    return opts
+
+async def run_fio_json(argv: List[str], cwd: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run fio with its JSON report written to a scratch file (--output) rather than a
+    stdout pipe, then parse the file bytes in one go. Returns {"error": ...} on failure.
+    """
+    fd, out_path = tempfile.mkstemp(prefix="nvmeqa_fio_", suffix=".json")
+    os.close(fd)
     try:
-        return json.loads(raw)
-    except Exception:
-        return {"error": raw}
+        rc, _out, err = await _exec_async([*argv, f"--output={out_path}"], cwd=cwd)
+        if rc != 0:
+            return {"error": f"Error: {sanitize_cmd_output(err.decode('utf-8', errors='replace'))}"}
+        with open(out_path, "rb") as f:
+            data = f.read()
+        try:
+            return _json_loads(data)
+        except Exception:
+            return {"error": sanitize_cmd_output(data.decode("utf-8", errors="replace"))}
+    finally:
+        os.unlink(out_path)
+
+@lru_cache(maxsize=32)
+def _fio_argv_template(runtime: int, iodepth: int, bs: str, ioengine: str,
+                       file_size: Optional[str], engine_opts: Tuple[str, ...]) -> Tuple[str, ...]:
+    """fio argv shared by every workload of a run; only --filename and --rw vary per call."""
+    argv = [
+        "fio", "--name=nvme_test", f"--bs={bs}", f"--iodepth={iodepth}", f"--runtime={runtime}",
+        "--time_based=1", f"--ioengine={ioengine}", "--output-format=json",
+        *(f"--{o}" for o in engine_opts),
+    ]
+    if file_size:
+        argv.append(f"--size={file_size}")
+    return tuple(argv)
+
+async def run_fio_test(target: str, rw: str, runtime: int, iodepth: int, bs: str,
+                       ioengine: str, on_fs: bool = False, file_size: Optional[str] = None,
+                       engine_opts: Sequence[str] = ()) -> Dict[str, Any]:
+    tmpl = _fio_argv_template(runtime, iodepth, bs, ioengine,
+                              file_size if on_fs else None, tuple(engine_opts))
+    return await run_fio_json([*tmpl, f"--filename={target}", f"--rw={rw}"])
+
+def fio_start_marker(start_dir: str, rw: str) -> str:
+    return os.path.join(start_dir, f"{rw}.start")
+
+async def run_fio_batch(targets: Dict[str, str], runtime: int, iodepth: int, bs: str,
+                        ioengine: str, on_fs: Optional[Dict[str, bool]] = None,
+                        file_size: Optional[str] = None,
+                        engine_opts: Optional[Dict[str, Sequence[str]]] = None,
+                        start_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run all workloads in one fio process: a [global] section plus one stonewalled
+    job per rw mode, so jobs run back-to-back (never concurrently) against the target.
+
+    `on_fs` and `engine_opts` are per rw mode, like the targets: only jobs on a
+    filesystem file get `size=file_size`, so a raw namespace is never size-capped.
 
-def extract_fio_trends(fio_json: Dict[str, Any]) -> Dict[str, List[float]]:
-    trends = {"iops": [], "latency": []}
+    With `start_dir`, fio touches `<start_dir>/<rw>.start` (exec_prerun) as each job
+    begins I/O, i.e. after startup and file layout, and runs with that directory as
+    its cwd so the `<rw>.prerun.txt` files it writes land there too.
+
+    Returns {rw: fio_json} where each fio_json has the same shape as run_fio_test's.
+    """
+    on_fs = on_fs or {}
+    engine_opts = engine_opts or {}
+    lines = ["[global]", f"bs={bs}", f"iodepth={iodepth}", f"runtime={runtime}",
+             "time_based=1", f"ioengine={ioengine}"]
+    for rw, target in targets.items():
+        lines += ["", f"[{rw}]", f"rw={rw}", f"filename={target}", "stonewall", *engine_opts.get(rw, ())]
+        if on_fs.get(rw) and file_size:
+            lines.append(f"size={file_size}")
+        if start_dir:
+            lines.append(f"exec_prerun=touch {shlex.quote(fio_start_marker(start_dir, rw))}")
+    fd, jobfile = tempfile.mkstemp(prefix="nvmeqa_", suffix=".fio")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        out = await run_fio_json(["fio", "--output-format=json", jobfile], cwd=start_dir)
+    finally:
+        os.unlink(jobfile)
+    if "jobs" not in out:
+        return {rw: out for rw in targets}
+    top = {k: v for k, v in out.items() if k != "jobs"}
+    return {rw: {**top, "jobs": [j for j in out["jobs"] if j.get("jobname") == rw]} for rw in targets}
+
+def extract_fio_trends(fio_json: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Per-job IOPS and mean completion latency (us) as float arrays; read side wins when non-zero."""
     jobs = fio_json.get("jobs", [])
-    for job in jobs:
-        read_iops = job.get("read", {}).get("iops", 0)
-        write_iops = job.get("write", {}).get("iops", 0)
-        trends["iops"].append(read_iops or write_iops)
-        read_lat = job.get("read", {}).get("clat_ns", {}).get("mean", 0) / 1000.0
-        write_lat = job.get("write", {}).get("clat_ns", {}).get("mean", 0) / 1000.0
-        trends["latency"].append(read_lat or write_lat)
-    return trends
+    n = len(jobs)
+
+    def column(side: str, *path: str) -> np.ndarray:
+        def get(job: Dict[str, Any]) -> float:
+            v: Any = job.get(side, {})
+            for k in path:
+                v = v.get(k, {})
+            return v or 0
+        return np.fromiter((get(j) for j in jobs), dtype=np.float64, count=n)
+
+    r_iops, w_iops = column("read", "iops"), column("write", "iops")
+    r_lat, w_lat = column("read", "clat_ns", "mean"), column("write", "clat_ns", "mean")
+    return {
+        "iops": np.where(r_iops != 0, r_iops, w_iops),
+        "latency": np.where(r_lat != 0, r_lat, w_lat) / 1000.0,
+    }
 
 # ============================
 # Plotting (fixed)
 # ============================
-def plot_series(values: List[float], title: str, ylabel: str) -> str:
-    if not values:
+_FIG_LOCAL = threading.local()
+
+def _reuse_figure(figsize: Tuple[float, float]):
+    """
+    Return this thread's cached Figure, cleared and resized for the next plot.
+    Avoids allocating (and closing) a new Figure per trend. The Figure is bound to
+    an Agg canvas directly, bypassing pyplot's figure manager and global state.
+    """
+    fig = getattr(_FIG_LOCAL, "fig", None)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _FIG_LOCAL.fig = fig
+    else:
+        fig.clear()
+        fig.set_size_inches(*figsize)
+    return fig
+
+_PLOT_MAX_POINTS = 500   # longer series are LTTB-downsampled before plotting
+_PLOT_MAX_TICKS = 10
+
+def _lttb(values: Any, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013).
+    Returns (indices, values) of at most `threshold` points; first and last are always kept.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = y.size
+    if threshold < 3 or n <= threshold:
+        return np.arange(n), y
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)  # threshold-2 interior buckets
+    idx = np.empty(threshold, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < threshold - 1 else n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx, y[idx]
+
+def _set_time_axis(ax, times: List[str]) -> None:
+    """Label a sample-index x axis with HH:MM:SS strings, bounded to a few ticks."""
+    ax.xaxis.set_major_locator(MaxNLocator(nbins=_PLOT_MAX_TICKS, integer=True))
+    ax.xaxis.set_major_formatter(FuncFormatter(
+        lambda v, _pos: times[int(v)] if 0 <= int(v) < len(times) else ""))
+    ax.tick_params(axis="x", labelrotation=45, labelsize=8)
+
+def plot_series(values: List[float], title: str, ylabel: str, fmt: str = "svg") -> str:
+    if len(values) < 2:  # a single point is not a trend; skip Figure work entirely
         return ""
-    fig, ax = plt.subplots(figsize=(6, 3))
-    ax.plot(range(1, len(values) + 1), values, marker="o")
+    idx, vals = _lttb(values, _PLOT_MAX_POINTS)
+    fig = _reuse_figure((6, 3))
+    ax = fig.add_subplot(111)
+    ax.plot(idx + 1, vals, marker="o")
     ax.set_title(title)
     ax.set_xlabel("Interval")
     ax.set_ylabel(ylabel)
     ax.grid(True)
     fig.tight_layout()
-    return b64_plot(fig)
+    return _encode_plot(fig, fmt)
 
-def plot_smart_trend(logs: List[Dict[str, Any]], metric: str, ylabel: str) -> str:
-    if not logs:
+def plot_smart_trend(logs: np.ndarray, metric: str, ylabel: str, fmt: str = "svg") -> str:
+    if len(logs) < 2:
         return ""
-    times = [e["time"] for e in logs]
-    vals = [e.get(metric, 0) for e in logs]
-    fig, ax = plt.subplots(figsize=(6, 3))
-    x = list(range(len(times)))
+    times = logs["time"].tolist()
+    x, vals = _lttb(logs[metric], _PLOT_MAX_POINTS)
+    fig = _reuse_figure((6, 3))
+    ax = fig.add_subplot(111)
     ax.plot(x, vals, marker="o")
     ax.set_title(f"{metric.replace('_',' ').title()} Trend")
     ax.set_ylabel(ylabel)
     ax.set_xlabel("Time")
-    ax.set_xticks(x)
-    ax.set_xticklabels(times, rotation=45, fontsize=8)
+    _set_time_axis(ax, times)
     ax.grid(True)
     fig.tight_layout()
-    return b64_plot(fig)
+    return _encode_plot(fig, fmt)
 
-def _resample_to_len(values: List[float], target_len: int) -> List[float]:
+def _resample_to_len(values: Any, target_len: int) -> np.ndarray:
+    """Nearest-index resample of `values` to `target_len` points (zeros when empty); always a new array."""
+    y = np.asarray(values, dtype=np.float64)
     if target_len <= 0:
-        return []
-    if not values:
-        return [0.0] * target_len
-    n = len(values)
+        return np.empty(0)
+    n = y.size
+    if not n:
+        return np.zeros(target_len)
     if n == target_len:
-        return values
+        return y.copy()  # never an alias of the caller's trend array
     if target_len == 1:
-        return [values[0]]
-    mapped: List[float] = []
-    for i in range(target_len):
-        src = round(i * (n - 1) / (target_len - 1))
-        mapped.append(values[src])
-    return mapped
-
-def plot_combined_timeline(smart_logs: List[Dict[str, Any]], fio_trends: Dict[str, List[float]], workload: str) -> str:
-    if not smart_logs:
+        return y[:1].copy()
+    # np.rint rounds half-to-even, matching the builtin round() used previously.
+    idx = np.rint(np.arange(target_len, dtype=np.float64) * (n - 1) / (target_len - 1)).astype(np.intp)
+    return y[idx]
+
+def plot_combined_timeline(smart_logs: np.ndarray, fio_trends: Dict[str, Any], workload: str,
+                           fmt: str = "svg") -> str:
+    if len(smart_logs) < 2:
         return ""
-    times = [e["time"] for e in smart_logs]
-    temps = [e.get("temperature", 0) for e in smart_logs]
-    x = list(range(len(times)))
+    times = smart_logs["time"].tolist()
+    x, temps = _lttb(smart_logs["temperature"], _PLOT_MAX_POINTS)
 
     iops_series = _resample_to_len(fio_trends.get("iops", []), len(times))
-    lat_series  = _resample_to_len(fio_trends.get("latency", []), len(times)) if fio_trends.get("latency") else []
+    lat_series  = _resample_to_len(fio_trends.get("latency", []), len(times))
 
-    fig, ax1 = plt.subplots(figsize=(7, 4))
+    fig = _reuse_figure((7, 4))
+    ax1 = fig.add_subplot(111)
     ax1.set_xlabel("Time")
     ax1.set_ylabel("Temperature (�XC)", color="tab:red")
     ax1.plot(x, temps, marker="o")
     ax1.tick_params(axis="y", labelcolor="tab:red")
-    ax1.set_xticks(x)
-    ax1.set_xticklabels(times, rotation=45, fontsize=8)
+    _set_time_axis(ax1, times)
 
     ax2 = ax1.twinx()
     ax2.set_ylabel("IOPS / Latency (us)", color="tab:blue")
-    if any(iops_series):
-        ax2.plot(x, iops_series, marker="s")
-    if lat_series and any(lat_series):
-        ax2.plot(x, lat_series, marker="^")
+    if iops_series.any():
+        ax2.plot(*_lttb(iops_series, _PLOT_MAX_POINTS), marker="s")
+    if lat_series.any():
+        ax2.plot(*_lttb(lat_series, _PLOT_MAX_POINTS), marker="^")
     ax2.tick_params(axis="y", labelcolor="tab:blue")
 
     fig.suptitle(f"Combined Timeline ({workload})")
     fig.tight_layout()
-    return b64_plot(fig)
+    return _encode_plot(fig, fmt)
+
+_SMART_METRICS = [("temperature", "Temp (�XC)"),
+                  ("percentage_used", "% Used"),
+                  ("media_errors", "Media Errors"),
+                  ("critical_warnings", "Critical Warnings")]
+
+def _plot_jobs(results: Dict[str, Any], img_fmt: str) -> List[Tuple[Tuple[str, ...], Any, tuple]]:
+    """Every plot the report will embed, as (key, plot_func, args), in report order."""
+    jobs: List[Tuple[Tuple[str, ...], Any, tuple]] = []
+    for ctrl, data in results.items():
+        for ns, ns_obj in data.get("namespaces", {}).items():
+            res = ns_obj.get("results", {})
+            logs = res.get("smart_logs", [])
+            if len(logs) >= 2:
+                for metric, ylabel in _SMART_METRICS:
+                    jobs.append(((ctrl, ns, "smart", metric), plot_smart_trend, (logs, metric, ylabel, img_fmt)))
+            for rw, wdata in res.get("workloads", {}).items():
+                trends = wdata.get("fio_trends")
+                if trends is None:
+                    continue
+                for label, title, ylabel, key in (("IOPS", "IOPS Trend", "IOPS", "iops"),
+                                                  ("Latency", "Latency Trend", "Latency (us)", "latency")):
+                    series = trends.get(key, [])
+                    if len(series) >= 2:
+                        jobs.append(((ctrl, ns, rw, label), plot_series, (series, title, ylabel, img_fmt)))
+                if len(logs) >= 2:
+                    jobs.append(((ctrl, ns, rw, "combined"), plot_combined_timeline, (logs, trends, rw, img_fmt)))
+    return jobs
+
+def render_plots(jobs: List[Tuple[Tuple[str, ...], Any, tuple]], workers: int) -> Dict[Tuple[str, ...], str]:
+    """
+    Render plot jobs across worker processes (Agg rasterizing holds the GIL, so threads
+    don't scale). Falls back to in-process rendering if the pool can't be used.
+    """
+    workers = min(workers, os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        try:
+            methods = mp.get_all_start_methods()
+            ctx = mp.get_context("forkserver" if "forkserver" in methods else methods[0])
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futs = [pool.submit(func, *args) for _, func, args in jobs]
+                return {key: fut.result() for (key, _, _), fut in zip(jobs, futs)}
+        except Exception as e:
+            print(f"[WARN] Parallel plot rendering unavailable ({e}); rendering in-process.")
+    return {key: func(*args) for key, func, args in jobs}
 
 # ============================
 # Workers (per workload / namespace)
 # ============================
-def test_workload(ns: str, rw: str, fio_cfg: Dict[str, Any], tel_cfg: Dict[str, Any],
-                  ctrl: str, fio_target: Optional[str] = None, on_fs: bool = False) -> Dict[str, Any]:
+# One right-sized pool for the whole run's namespace tasks. Threads are created lazily,
+# so this costs nothing until work is submitted. A namespace's workloads all run at once
+# on that namespace's event loop (see test_namespace), never in this pool, so their
+# overlap doesn't depend on the host CPU count.
+POOL_SIZE = min(32, (os.cpu_count() or 4) * 2)
+EXECUTOR = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="nvmeqa")
+
+async def workload_async(ns: str, rw: str, fio_cfg: Dict[str, Any], tel_cfg: Dict[str, Any],
+                         ctrl: str, fio_target: Optional[str] = None, on_fs: bool = False) -> Dict[str, Any]:
     runtime = int(fio_cfg["runtime"])
-    with ThreadPoolExecutor(max_workers=4) as ex:
-        fut_sensors = ex.submit(sensors_monitor, int(tel_cfg["sensors_interval"]), runtime)
-        fut_turbo   = ex.submit(turbostat_run, runtime, int(tel_cfg["turbostat_interval"]))
-        fut_power   = ex.submit(power_monitor, ctrl, int(tel_cfg.get("power_interval", 2)), runtime)
-        fut_fio     = ex.submit(
-            run_fio_test,
+
+    # fio and its telemetry side-probes are all subprocess waits: coroutines on the
+    # caller's event loop, no extra threads.
+    fio_json, sensors_seq, turbostat_txt, power_seq = await asyncio.gather(
+        run_fio_test(
             fio_target if fio_target else ns,
             rw,
             runtime,
@@ -718,11 +1618,13 @@ def test_workload(ns: str, rw: str, fio_cfg: Dict[str, Any], tel_cfg: Dict[str,
             str(fio_cfg.get("ioengine", "io_uring")),
             on_fs,
             str(fio_cfg.get("file_size")) if on_fs else None,
-        )
-        fio_json = fut_fio.result()
-        sensors_seq = fut_sensors.result()
-        turbostat_txt = fut_turbo.result()
-        power_seq = fut_power.result()
+            fio_engine_opts(fio_cfg, on_fs),
+        ),
+        sensors_monitor(int(tel_cfg["sensors_interval"]), runtime, str(tel_cfg.get("sensors_source", "sysfs"))),
+        turbostat_run(runtime, int(tel_cfg["turbostat_interval"]),
+                      int(tel_cfg.get("max_output_bytes", _OUTPUT_CAP))),
+        power_monitor(ctrl, int(tel_cfg.get("power_interval", 2)), runtime),
+    )
 
     return {
         "workload": rw,
@@ -737,6 +1639,74 @@ def test_workload(ns: str, rw: str, fio_cfg: Dict[str, Any], tel_cfg: Dict[str,
         },
     }
 
+def test_workload(ns: str, rw: str, fio_cfg: Dict[str, Any], tel_cfg: Dict[str, Any],
+                  ctrl: str, fio_target: Optional[str] = None, on_fs: bool = False) -> Dict[str, Any]:
+    """Run one workload on its own event loop (test_namespace runs all of them on one loop)."""
+    return asyncio.run(workload_async(ns, rw, fio_cfg, tel_cfg, ctrl, fio_target, on_fs))
+
+def test_workloads_batched(ns: str, workloads: List[str], fio_cfg: Dict[str, Any], tel_cfg: Dict[str, Any],
+                           ctrl: str, fio_targets: Dict[str, Optional[str]], on_fs: bool = False) -> Dict[str, Any]:
+    """
+    Batched counterpart of test_workload for every rw mode at once: a single fio
+    process runs the stonewalled jobs sequentially, and each workload's telemetry
+    probes are started in its own runtime window on the same event loop.
+
+    Windows follow fio's own timing: each starts when fio signals that job's start
+    (see run_fio_batch), so fio startup and file layout don't shift telemetry onto
+    the wrong workload.
+    """
+    runtime = int(fio_cfg["runtime"])
+    targets = {rw: fio_targets[rw] or ns for rw in workloads}
+    # Decided per target, as in the per-workload path: raw namespaces never get fs options.
+    fs_by_rw = {rw: on_fs and fio_targets[rw] is not None for rw in workloads}
+
+    async def window(rw: str, start_dir: str, fio_task: "asyncio.Task"):
+        marker = fio_start_marker(start_dir, rw)
+        while not os.path.exists(marker):
+            if fio_task.done():  # fio ended (or failed) before this job started
+                return [], "", []
+            await asyncio.sleep(0.05)
+        return await asyncio.gather(
+            sensors_monitor(int(tel_cfg["sensors_interval"]), runtime, str(tel_cfg.get("sensors_source", "sysfs"))),
+            turbostat_run(runtime, int(tel_cfg["turbostat_interval"]),
+                          int(tel_cfg.get("max_output_bytes", _OUTPUT_CAP))),
+            power_monitor(ctrl, int(tel_cfg.get("power_interval", 2)), runtime),
+        )
+
+    async def probes():
+        with tempfile.TemporaryDirectory(prefix="nvmeqa_batch_") as start_dir:
+            fio_task = asyncio.ensure_future(run_fio_batch(
+                targets,
+                runtime,
+                int(fio_cfg["iodepth"]),
+                str(fio_cfg["bs"]),
+                str(fio_cfg.get("ioengine", "io_uring")),
+                fs_by_rw,
+                str(fio_cfg.get("file_size")) if any(fs_by_rw.values()) else None,
+                {rw: fio_engine_opts(fio_cfg, fs_by_rw[rw]) for rw in workloads},
+                start_dir=start_dir,
+            ))
+            return await asyncio.gather(fio_task, *(window(rw, start_dir, fio_task) for rw in workloads))
+
+    fio_by_rw, *windows = asyncio.run(probes())
+
+    out: Dict[str, Any] = {}
+    for rw, (sensors_seq, turbostat_txt, power_seq) in zip(workloads, windows):
+        fio_json = fio_by_rw[rw]
+        out[rw] = {
+            "workload": rw,
+            "using_fs": fs_by_rw[rw],
+            "fio_target": targets[rw],
+            "fio_json": fio_json,
+            "fio_trends": extract_fio_trends(fio_json),
+            "telemetry": {
+                "sensors_series": sensors_seq,
+                "turbostat": turbostat_txt,
+                "power_states": power_seq,
+            },
+        }
+    return out
+
 def test_namespace(ns: str, cfg: Dict[str, Any], mountpoint: Optional[str] = None) -> Dict[str, Any]:
     smart_cfg = cfg["smart"]
     fio_cfg   = cfg["fio"].copy()
@@ -762,26 +1732,30 @@ def test_namespace(ns: str, cfg: Dict[str, Any], mountpoint: Optional[str] = Non
             fio_targets[rw] = None  # raw namespace
 
     results: Dict[str, Any] = {"smart_logs": smart_logs, "workloads": {}}
-    with ThreadPoolExecutor(max_workers=len(workloads)) as executor:
-        futures = {
-            executor.submit(
-                test_workload,
-                ns,
-                rw,
-                fio_cfg,
-                tel_cfg,
-                ctrl,
-                fio_target=fio_targets[rw],
-                on_fs=fio_on_fs and fio_targets[rw] is not None,
-            ): rw
-            for rw in workloads
-        }
-        for future in as_completed(futures):
-            rw = futures[future]
-            try:
-                results["workloads"][rw] = future.result()
-            except Exception as e:
-                results["workloads"][rw] = {"error": str(e)}
+    if fio_cfg.get("batch", False):
+        try:
+            results["workloads"] = test_workloads_batched(
+                ns, workloads, fio_cfg, tel_cfg, ctrl, fio_targets, on_fs=fio_on_fs
+            )
+        except Exception as e:
+            results["workloads"] = {rw: {"error": str(e)} for rw in workloads}
+        return results
+
+    # Every workload of a namespace runs concurrently, independent of POOL_SIZE, so the
+    # measured IOPS/latency and per-workload telemetry are comparable across hosts. They
+    # are all subprocess waits, so one event loop drives them (no per-workload threads);
+    # gather keeps the configured workload order for the report.
+    async def run_all():
+        return await asyncio.gather(
+            *(workload_async(ns, rw, fio_cfg, tel_cfg, ctrl,
+                             fio_target=fio_targets[rw],
+                             on_fs=fio_on_fs and fio_targets[rw] is not None)
+              for rw in workloads),
+            return_exceptions=True,
+        )
+
+    for rw, res in zip(workloads, asyncio.run(run_all())):
+        results["workloads"][rw] = {"error": str(res)} if isinstance(res, BaseException) else res
     return results
 
 # ============================
@@ -825,11 +1799,35 @@ def maybe_unmount_namespace(ns: str, cfg: Dict[str, Any], provision_result: Dict
 def consolidate_results(controllers: List[str], cfg: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
     out_dir = cfg["output_dir"]
     Path(out_dir).mkdir(parents=True, exist_ok=True)
-    results: Dict[str, Any] = {}
 
-    for ctrl in controllers:
+    # Build the full report skeleton up front; the loop below only fills slots.
+    plan: Dict[str, List[str]] = {ctrl: list_nvme_namespaces(ctrl, cfg) for ctrl in controllers}
+    results: Dict[str, Any] = {
+        ctrl: {
+            "info": {},
+            "namespaces": {ns: {"provision": {}, "results": {}, "post": {}} for ns in plan[ctrl]},
+        }
+        for ctrl in controllers
+    }
+
+    # Without a sanitize step nothing changes the devices before testing starts, so probe
+    # every controller at once; 'nvme list' is host-wide and reused from discovery.
+    infos: Dict[str, Dict[str, Any]] = {}
+    if not cfg["sanitize"]["enabled"]:
+        infos = asyncio.run(collect_device_info(controllers, cfg, _nvme_inventory()["list_json"]))
+
+    # Cap how many namespaces are in flight across all controllers. Workloads run on
+    # each namespace's own event loop, so namespace tasks never wait on EXECUTOR slots.
+    max_ns = int(cfg.get("parallelism", {}).get("max_ns_workers") or 1)
+    gate = threading.BoundedSemaphore(max(1, min(max_ns, POOL_SIZE)))
+
+    def process_controller(ctrl: str) -> None:
+        dev_data: Dict[str, Any] = results[ctrl]
+        ns_slots: Dict[str, Dict[str, Any]] = dev_data["namespaces"]
+        namespaces = plan[ctrl]
+
         if cfg["sanitize"]["enabled"]:
-            results.setdefault(ctrl, {})["sanitize"] = sanitize_controller(
+            dev_data["sanitize"] = sanitize_controller(
                 ctrl=ctrl,
                 action=str(cfg["sanitize"]["action"]),
                 ause=bool(cfg["sanitize"]["ause"]),
@@ -838,34 +1836,62 @@ def consolidate_results(controllers: List[str], cfg: Dict[str, Any]) -> Tuple[st
                 timeout=int(cfg["sanitize"]["timeout"]),
             )
 
-        namespaces = list_nvme_namespaces(ctrl, cfg)
-        dev_data: Dict[str, Any] = results.setdefault(ctrl, {})
-        dev_data["info"] = get_device_info(ctrl)
-        dev_data["namespaces"] = {}
+        dev_data["info"] = infos[ctrl] if ctrl in infos else get_device_info(ctrl, cfg)
 
-        prov_map: Dict[str, Dict[str, Any]] = {}
         for ns in namespaces:
-            prov_map[ns] = maybe_provision_namespace(ns, cfg)
-
-        with ThreadPoolExecutor(max_workers=len(namespaces) or 1) as executor:
-            futmap = {
-                executor.submit(
-                    test_namespace, ns, cfg, mountpoint=prov_map.get(ns, {}).get("mountpoint")
-                ): ns
-                for ns in namespaces
-            }
-            for fut in as_completed(futmap):
-                ns = futmap[fut]
+            ns_slots[ns]["provision"] = maybe_provision_namespace(ns, cfg)
+
+        def submit_ns(ns: str):
+            gate.acquire()
+            fut = EXECUTOR.submit(test_namespace, ns, cfg, mountpoint=ns_slots[ns]["provision"].get("mountpoint"))
+            fut.add_done_callback(lambda _f: gate.release())
+            return fut
+
+        # Optional interrupt coalescing for the test window; the prior value is restored after.
+        # Without a readable prior value there is nothing to restore, so the drive is left alone.
+        coalesce = int(cfg["fio"].get("irq_coalesce") or 0)
+        prev_coalesce = None
+        if coalesce:
+            prev_coalesce = get_feature_value(ctrl, _FID_IRQ_COALESCING)
+            dev_data["irq_coalescing"] = {"previous": prev_coalesce, "value": coalesce}
+            if prev_coalesce is None:
+                dev_data["irq_coalescing"]["set"] = "Skipped: current value unreadable"
+            else:
+                dev_data["irq_coalescing"]["set"] = set_feature_value(ctrl, _FID_IRQ_COALESCING, coalesce)
+        try:
+            futs = [(ns, submit_ns(ns)) for ns in namespaces]
+            for ns, fut in futs:
                 try:
-                    dev_data["namespaces"][ns] = {"provision": prov_map.get(ns, {}), "results": fut.result()}
+                    ns_slots[ns]["results"] = fut.result()
                 except Exception as e:
-                    dev_data["namespaces"][ns] = {"provision": prov_map.get(ns, {}), "results": {"error": str(e)}}
+                    ns_slots[ns]["results"] = {"error": str(e)}
+        finally:
+            if prev_coalesce is not None:
+                dev_data["irq_coalescing"]["restore"] = set_feature_value(ctrl, _FID_IRQ_COALESCING, prev_coalesce)
 
         for ns in namespaces:
-            dev_data["namespaces"][ns]["post"] = maybe_unmount_namespace(ns, cfg, dev_data["namespaces"][ns]["provision"])
+            ns_slots[ns]["post"] = maybe_unmount_namespace(ns, cfg, ns_slots[ns]["provision"])
 
         if cfg["telemetry"].get("nvme_telemetry", True):
-            dev_data["nvme_telemetry_log"] = nvme_telemetry_log(ctrl)
+            dev_data["nvme_telemetry_log"] = nvme_telemetry_log(
+                ctrl, int(cfg["telemetry"].get("max_output_bytes", _OUTPUT_CAP)))
+
+    # Controllers share nothing but the pool, so they may run side by side. The work is
+    # subprocess-bound (fio, nvme-cli, monitors), so threads suffice; each slot fills its
+    # own entry of the prebuilt skeleton. Defaults to 1 so concurrent drives don't skew
+    # each other's host-wide telemetry (CPU, package power, sensors).
+    max_ctrl = max(1, min(int(cfg.get("parallelism", {}).get("max_ctrl_workers") or 1), len(controllers)))
+    if max_ctrl == 1:
+        for ctrl in controllers:
+            process_controller(ctrl)
+    else:
+        with ThreadPoolExecutor(max_workers=max_ctrl, thread_name_prefix="nvmeqa-ctrl") as pool:
+            futs = [(ctrl, pool.submit(process_controller, ctrl)) for ctrl in controllers]
+            for ctrl, fut in futs:
+                try:
+                    fut.result()
+                except Exception as e:
+                    results[ctrl]["error"] = str(e)
 
     json_path = os.path.join(out_dir, f"ssd_report_{timestamp()}.json")
     save_json(results, json_path)
@@ -876,88 +1902,140 @@ def generate_html_report(results: Dict[str, Any], cfg: Dict[str, Any]) -> str:
     Path(out_dir).mkdir(parents=True, exist_ok=True)
     html_file = os.path.join(out_dir, f"ssd_report_{timestamp()}.html")
 
-    html: List[str] = [
-        "<html><head><meta charset='utf-8'><title>NVMe SSD Report</title></head><body>",
-        "<h1>Enterprise NVMe PCIe Gen5 SSD Report</h1><hr>",
-    ]
-
-    for ctrl, data in results.items():
-        html.append(f"<h2>Controller: {ctrl}</h2>")
-        if "sanitize" in data:
-            html.append(f"<details><summary>Sanitize Result</summary><pre>{html_escape(str(data['sanitize']))}</pre></details>")
-
-        info_pretty = html_escape(json.dumps(data.get("info", {}), indent=2))
-        html.append(f"<h3>Device Info</h3><pre>{info_pretty}</pre>")
-
-        if data.get("nvme_telemetry_log"):
-            html.append("<details><summary>NVMe Telemetry Log (controller)</summary>")
-            html.append(f"<pre>{html_escape(str(data['nvme_telemetry_log']))}</pre></details>")
-
-        for ns, ns_obj in data.get("namespaces", {}).items():
-            html.append(f"<h3>Namespace: {ns}</h3>")
-
-            prov = ns_obj.get("provision", {}).get("actions", {})
-            if prov:
-                html.append("<details><summary>Provisioning</summary><pre>")
-                html.append(html_escape(json.dumps(prov, indent=2)))
-                html.append("</pre></details>")
-
-            res = ns_obj.get("results", {})
-            logs = res.get("smart_logs", [])
-            if logs:
-                html.append("<h4>SMART Trends</h4>")
-                for metric, ylabel in [("temperature", "Temp (�XC)"),
-                                       ("percentage_used", "% Used"),
-                                       ("media_errors", "Media Errors"),
-                                       ("critical_warnings", "Critical Warnings")]:
-                    b64 = plot_smart_trend(logs, metric, ylabel)
-                    if b64:
-                        html.append(f"<p>{metric}</p><img src='data:image/png;base64,{b64}'/>")
-
-            workloads = res.get("workloads", {})
-            for rw, wdata in workloads.items():
-                if "fio_trends" in wdata:
-                    html.append(f"<h4>Workload: {rw} {'(fio_on_fs)' if wdata.get('using_fs') else '(raw)'} </h4>")
-                    html.append(f"<p><b>Target:</b> {html_escape(str(wdata.get('fio_target')))}</p>")
-                    iops = wdata["fio_trends"].get("iops", [])
-                    lat = wdata["fio_trends"].get("latency", [])
-                    if iops:
-                        b64 = plot_series(iops, "IOPS Trend", "IOPS")
-                        html.append(f"<p>IOPS</p><img src='data:image/png;base64,{b64}'/>")
-                    if lat:
-                        b64 = plot_series(lat, "Latency Trend", "Latency (us)")
-                        html.append(f"<p>Latency</p><img src='data:image/png;base64,{b64}'/>")
-                    combined = plot_combined_timeline(logs, wdata["fio_trends"], rw)
-                    if combined:
-                        html.append(f"<h4>Combined Timeline ({rw})</h4>")
-                        html.append(f"<img src='data:image/png;base64,{combined}'/>")
-
-                    tele = wdata.get("telemetry", {})
-                    if tele:
-                        html.append("<details><summary>Per-Workload Telemetry</summary><pre>")
-                        html.append(html_escape(json.dumps({
-                            "power_states": tele.get("power_states", []),
-                            "sensors_series": tele.get("sensors_series", "n/a"),
-                            "turbostat": (tele.get("turbostat", "n/a") or "")[:100000],
-                        }, indent=2)))
-                        html.append("</pre></details>")
-
-            post = ns_obj.get("post", {})
-            if post:
-                html.append("<details><summary>Post Actions</summary><pre>")
-                html.append(html_escape(json.dumps(post, indent=2)))
-                html.append("</pre></details>")
-
-        html.append("<hr>")
-
-    html.append("</body></html>")
-    with open(html_file, "w", encoding="utf-8") as f:
-        f.write("".join(html))
+    # Sidecar mode: one minified JSON next to the HTML; sections reference it by pointer.
+    inline = bool(cfg.get("report", {}).get("inline", True))
+    data_name = Path(html_file).stem + ".data.json"
+    if not inline:
+        with open(os.path.join(out_dir, data_name), "wb") as f:
+            f.write(_json_dump_bytes(results))
+
+    plots = bool(cfg.get("report", {}).get("plots", True))
+    img_fmt = str(cfg.get("report", {}).get("image_format", "svg")).lower()
+    # Render every plot up front (in parallel); the write pass below only looks them up.
+    images = (render_plots(_plot_jobs(results, img_fmt),
+                           int(cfg.get("parallelism", {}).get("plot_workers", os.cpu_count() or 1)))
+              if plots else {})
+
+    with open(html_file, "w", encoding="utf-8", buffering=1 << 20) as f:
+        # Stream straight to disk: peak memory is one section, not the whole report.
+        # A 1 MiB buffer batches the many small fragments into few write() calls.
+        w = f.write
+
+        def json_details(summary: str, obj: Any, *path: str) -> None:
+            if inline:
+                w(f"<details><summary>{summary}</summary><pre>")
+                w(html_escape(obj) if isinstance(obj, str) else pretty_json_escaped(obj))
+                w("</pre></details>")
+                return
+            ref = html_escape(f"{data_name}#{_json_pointer(*path)}").replace('"', "&quot;")
+            w(f'<details><summary>{summary}</summary><pre data-json-path="{ref}"></pre></details>')
+
+        w("<html><head><meta charset='utf-8'><title>NVMe SSD Report</title></head><body>")
+        w("<h1>Enterprise NVMe PCIe Gen5 SSD Report</h1><hr>")
+
+        for ctrl, data in results.items():
+            w(f"<h2>Controller: {ctrl}</h2>")
+            if "sanitize" in data:
+                w(f"<details><summary>Sanitize Result</summary><pre>{html_escape(str(data['sanitize']))}</pre></details>")
+
+            if inline:
+                w(f"<h3>Device Info</h3><pre>{pretty_json_escaped(data.get('info', {}))}</pre>")
+            else:
+                w("<h3>Device Info</h3>")
+                json_details("Show", data.get("info", {}), ctrl, "info")
+
+            if data.get("nvme_telemetry_log"):
+                json_details("NVMe Telemetry Log (controller)", str(data["nvme_telemetry_log"]),
+                             ctrl, "nvme_telemetry_log")
+
+            for ns, ns_obj in data.get("namespaces", {}).items():
+                w(f"<h3>Namespace: {ns}</h3>")
+
+                prov = ns_obj.get("provision", {}).get("actions", {})
+                if prov:
+                    json_details("Provisioning", prov, ctrl, "namespaces", ns, "provision", "actions")
+
+                res = ns_obj.get("results", {})
+                logs = res.get("smart_logs", [])
+                if plots and len(logs) >= 2:
+                    w("<h4>SMART Trends</h4>")
+                    for metric, _ in _SMART_METRICS:
+                        img = images.get((ctrl, ns, "smart", metric))
+                        if img:
+                            w(f"<p>{metric}</p>{_img_html(img)}")
+
+                workloads = res.get("workloads", {})
+                for rw, wdata in workloads.items():
+                    if "fio_trends" in wdata:
+                        w(f"<h4>Workload: {rw} {'(fio_on_fs)' if wdata.get('using_fs') else '(raw)'} </h4>")
+                        w(f"<p><b>Target:</b> {html_escape(str(wdata.get('fio_target')))}</p>")
+                        iops = wdata["fio_trends"].get("iops", [])
+                        lat = wdata["fio_trends"].get("latency", [])
+                        for label, series, ylabel in (("IOPS", iops, "IOPS"), ("Latency", lat, "Latency (us)")):
+                            if len(series) == 1:
+                                w(f"<p><b>{ylabel}:</b> {series[0]:.2f}</p>")
+                            else:
+                                img = images.get((ctrl, ns, rw, label))
+                                if img:
+                                    w(f"<p>{label}</p>{_img_html(img)}")
+                        combined = images.get((ctrl, ns, rw, "combined"))
+                        if combined:
+                            w(f"<h4>Combined Timeline ({rw})</h4>")
+                            w(_img_html(combined))
+
+                        tele = wdata.get("telemetry", {})
+                        if not inline:
+                            if tele:
+                                json_details("Per-Workload Telemetry", tele, ctrl, "namespaces", ns,
+                                             "results", "workloads", rw, "telemetry")
+                        else:
+                            # Truncate before encoding so huge blobs never reach the encoder;
+                            # empty fields are omitted rather than serialized as placeholders.
+                            # Parsed samples stay structured; only raw text is previewed.
+                            tele_view: Dict[str, Any] = {}
+                            if tele.get("power_states"):
+                                tele_view["power_states"] = tele["power_states"]
+                            if tele.get("sensors_series"):
+                                tele_view["sensors_series"] = [
+                                    x if isinstance(x, dict) else _preview(str(x))
+                                    for x in tele["sensors_series"][:_PREVIEW_SAMPLES]
+                                ]
+                            # turbostat is plain text: emit it as-is rather than as an escaped JSON string.
+                            turbostat = _preview(str(tele.get("turbostat") or ""))
+                            if tele_view or turbostat:
+                                w("<details><summary>Per-Workload Telemetry</summary>")
+                                if tele_view:
+                                    w(f"<pre>{pretty_json_escaped(tele_view)}</pre>")
+                                if turbostat:
+                                    w(f"<p>turbostat</p><pre>{html_escape(turbostat)}</pre>")
+                                w("</details>")
+
+                post = ns_obj.get("post", {})
+                if post:
+                    json_details("Post Actions", post, ctrl, "namespaces", ns, "post")
+
+            w("<hr>")
+
+        if not inline:
+            w(_JSON_VIEWER_JS)
+        w("</body></html>")
     return html_file
 
 # ============================
 # CLI
 # ============================
+def raise_memlock_limit():
+    """
+    Raise the soft RLIMIT_MEMLOCK to the hard limit so fio's fixedbufs can pin its
+    buffers instead of failing setup under the (often 64 KiB) default.
+    """
+    try:
+        import resource
+        _, hard = resource.getrlimit(resource.RLIMIT_MEMLOCK)
+        resource.setrlimit(resource.RLIMIT_MEMLOCK, (hard, hard))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"[WARN] Could not raise RLIMIT_MEMLOCK: {e}")
+
 def main():
     ap = argparse.ArgumentParser(description="Enterprise NVMe PCIe Gen5 SSD QA Framework (config-driven)")
     ap.add_argument("--config", "-c", type=str, default=None, help="Path to YAML/JSON config")
@@ -968,6 +2046,7 @@ def main():
         os.execvp("sudo", ["sudo", "-E", sys.executable, __file__] + (["--config", args.config] if args.config else []))
 
     cfg = load_config(args.config)
+    raise_memlock_limit()
 
     controllers = list_nvme_controllers(cfg)
     if not controllers:
@@ -976,6 +2055,9 @@ def main():
     print(f"[INFO] Controllers under test: {controllers}")
 
     json_path, results = consolidate_results(controllers, cfg)
+    # EXECUTOR only runs namespace tasks (workloads run on each namespace's event loop);
+    # all of them are done, so free its threads before report rendering.
+    EXECUTOR.shutdown(wait=True)
     print(f"[OK] JSON saved: {json_path}")
 
     html_path = generate_html_report(results, cfg)
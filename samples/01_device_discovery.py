@@ -9,13 +9,13 @@ import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import print_header, print_section, list_nvme_devices_nvme_cli, re_filter, controller_from_ns
+from utils.common import print_header, print_section, list_nvme_devices, re_filter, controller_from_ns
 from utils.csv_export import save_device_info_csv, get_csv_filepath
 
 def list_controllers_and_namespaces(include_regex=".*", exclude_regex=""):
     print_header("NVMe Device Discovery")
     
-    controllers, namespaces = list_nvme_devices_nvme_cli()
+    controllers, namespaces = list_nvme_devices()
     
     if not controllers and not namespaces:
         print("No NVMe devices found. Make sure nvme-cli is installed and devices are present.")
@@ -43,9 +43,12 @@ def list_controllers_and_namespaces(include_regex=".*", exclude_regex=""):
 
 def export_to_csv(controllers, namespaces):
     device_info = []
+    ns_by_ctrl = {}
+    for ns in namespaces:
+        ns_by_ctrl.setdefault(controller_from_ns(ns), []).append(ns)
     
     for ctrl in controllers:
-        ctrl_namespaces = [ns for ns in namespaces if controller_from_ns(ns) == ctrl]
+        ctrl_namespaces = ns_by_ctrl.get(ctrl, [])
         if ctrl_namespaces:
             for ns in ctrl_namespaces:
                 device_info.append({
@@ -4,36 +4,39 @@ NVMe Device Information Sample
 Shows detailed device information including PCI details
 """
 
+import os
+import re
 import sys
-import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, print_section, list_nvme_devices_nvme_cli, 
-                         run_cmd, controller_from_ns)
-from utils.csv_export import save_device_info_csv, get_csv_filepath
+from utils.common import (print_header, print_section, list_nvme_devices, 
+                         run_argv, controller_from_ns, identify_controller)
+from utils.csv_export import save_device_info_csv_rows, get_csv_filepath
 
+_BDF_RE = re.compile(r"[0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7]")
+
+@lru_cache(maxsize=None)
 def get_pci_bdf_for_ctrl(ctrl: str):
-    import os
-    import re
-    
-    name = os.path.basename(ctrl)
-    bdf_re_full = re.compile(r"[0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7]")
-    
-    sys_node = f"/sys/class/nvme/{name}/device"
+    sys_node = f"/sys/class/nvme/{os.path.basename(ctrl)}/device"
     if os.path.exists(sys_node):
         try:
-            real_path = os.path.realpath(sys_node)
-            match = bdf_re_full.search(real_path)
-            if match:
-                return match.group(0)
+            # The realpath nests PCI devices parent-first; the last BDF is the endpoint
+            # (earlier ones are root ports / switches).
+            found = _BDF_RE.findall(os.path.realpath(sys_node))
+            if found:
+                return found[-1]
         except Exception:
             pass
     
     return None
 
-def get_device_detailed_info(ctrl: str):
+_LSPCI_KEEP = 500
+
+def get_device_detailed_info(ctrl: str, verbose: bool = True):
     info = {"controller": ctrl}
     
     bdf = get_pci_bdf_for_ctrl(ctrl)
@@ -53,12 +56,15 @@ def get_device_detailed_info(ctrl: str):
         except:
             info["current_link_width"] = "unknown"
         
-        lspci_output = run_cmd(f"lspci -s {bdf} -v")
-        info["lspci_output"] = lspci_output
+        if verbose:
+            # Only the head is ever shown; don't hold whole `lspci -v` dumps per device.
+            lspci_output = run_argv(["lspci", "-s", bdf, "-v"])
+            if len(lspci_output) > _LSPCI_KEEP:
+                lspci_output = lspci_output[:_LSPCI_KEEP] + "..."
+            info["lspci_output"] = lspci_output
     
-    id_ctrl_output = run_cmd(f"nvme id-ctrl -o json {ctrl}")
     try:
-        id_ctrl_json = json.loads(id_ctrl_output)
+        id_ctrl_json = identify_controller(ctrl)
         info["model"] = id_ctrl_json.get("mn", "unknown").strip()
         info["serial"] = id_ctrl_json.get("sn", "unknown").strip()
         info["firmware"] = id_ctrl_json.get("fr", "unknown").strip()
@@ -69,10 +75,10 @@ def get_device_detailed_info(ctrl: str):
     
     return info
 
-def show_device_info(device=None):
+def show_device_info(device=None, verbose=True):
     print_header("NVMe Device Information")
     
-    controllers, namespaces = list_nvme_devices_nvme_cli()
+    controllers, namespaces = list_nvme_devices()
     
     if not controllers:
         print("No NVMe controllers found")
@@ -89,14 +95,18 @@ def show_device_info(device=None):
     else:
         selected_controllers = controllers
     
-    device_infos = []
+    # Each controller's probes (lspci, nvme id-ctrl, sysfs) are independent subprocess
+    # waits: gather them concurrently, then print serially to keep the output ordered.
+    ns_by_ctrl = {}
+    for ns in namespaces:
+        ns_by_ctrl.setdefault(controller_from_ns(ns), []).append(ns)
+    
+    with ThreadPoolExecutor(max_workers=min(16, len(selected_controllers))) as ex:
+        device_infos = list(ex.map(lambda c: get_device_detailed_info(c, verbose), selected_controllers))
     
-    for ctrl in selected_controllers:
+    for ctrl, info in zip(selected_controllers, device_infos):
         print_section(f"Controller: {ctrl}")
         
-        info = get_device_detailed_info(ctrl)
-        device_infos.append(info)
-        
         print(f"PCI BDF: {info['pci_bdf']}")
         print(f"Model: {info['model']}")
         print(f"Serial: {info['serial']}")
@@ -104,7 +114,7 @@ def show_device_info(device=None):
         print(f"Link Speed: {info.get('current_link_speed', 'unknown')}")
         print(f"Link Width: {info.get('current_link_width', 'unknown')}")
         
-        ctrl_namespaces = [ns for ns in namespaces if controller_from_ns(ns) == ctrl]
+        ctrl_namespaces = ns_by_ctrl.get(ctrl, [])
         if ctrl_namespaces:
             print("Namespaces:")
             for ns in ctrl_namespaces:
@@ -112,7 +122,7 @@ def show_device_info(device=None):
         
         if info.get("lspci_output") and not info["lspci_output"].startswith("Error:"):
             print("\nPCI Details:")
-            print(info["lspci_output"][:500] + "..." if len(info["lspci_output"]) > 500 else info["lspci_output"])
+            print(info["lspci_output"])
         
         print()
     
@@ -122,26 +132,20 @@ def main():
     parser = argparse.ArgumentParser(description="NVMe Device Information")
     parser.add_argument("--device", help="Specific device to query (controller or namespace)")
     parser.add_argument("--csv", action="store_true", help="Export results to CSV")
+    parser.add_argument("--no-lspci", action="store_true", help="Skip the lspci -v PCI details")
     args = parser.parse_args()
     
-    device_infos = show_device_info(args.device)
+    device_infos = show_device_info(args.device, verbose=not args.no_lspci)
     
     if args.csv and device_infos:
-        csv_data = []
-        for info in device_infos:
-            csv_data.append({
-                'controller': info['controller'],
-                'namespace': 'multiple',
-                'pci_bdf': info['pci_bdf'],
-                'model': info['model'],
-                'serial': info['serial'],
-                'firmware': info['firmware'],
-                'link_speed': info.get('current_link_speed', 'unknown'),
-                'link_width': info.get('current_link_width', 'unknown')
-            })
+        # Tuples in DEVICE_INFO_FIELDS order, written straight through csv.writer.
+        rows = [(info['controller'], 'multiple', info['pci_bdf'], info['model'], info['serial'],
+                 info['firmware'], info.get('current_link_speed', 'unknown'),
+                 info.get('current_link_width', 'unknown'))
+                for info in device_infos]
         
         csv_path = get_csv_filepath("device_info")
-        result = save_device_info_csv(csv_data, csv_path)
+        result = save_device_info_csv_rows(rows, csv_path)
         print(f"CSV Export: {result}")
 
 if __name__ == "__main__":
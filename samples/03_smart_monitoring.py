@@ -5,34 +5,56 @@ Real-time monitoring of SMART health data
 """
 
 import sys
-import json
 import time
 import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, print_section, list_nvme_devices_nvme_cli, 
-                         get_nvme_health, time_hms, controller_from_ns, get_temperature_celsius)
+from utils.common import (print_header, print_section, list_nvme_devices, 
+                         get_nvme_health, time_hms, controller_from_ns, get_temperature_celsius,
+                         SmartReader, sleep_to_next_tick, _json_loads)
 from utils.csv_export import save_health_data_csv, get_csv_filepath
 
-def monitor_smart_data(namespace: str, interval: int = 5, duration: int = 30):
+_BACKOFF_MAX = 60  # seconds
+
+def _backoff_sleep(failures: int, interval: float, end_t: float) -> float:
+    # Exponential backoff while the device keeps failing, never sleeping past the run end.
+    delay = min(interval * (1 << min(failures, 6)), _BACKOFF_MAX, end_t - time.monotonic())
+    if delay > 0:
+        time.sleep(delay)
+    return time.monotonic()
+
+def monitor_smart_data(namespace: str, interval: int = 5, duration: int = 30, keep_logs: bool = True):
     print_header(f"SMART Monitoring: {namespace}")
     print(f"Monitoring for {duration} seconds with {interval}s intervals")
     print("Press Ctrl+C to stop early\n")
     
     logs = []
-    start_time = time.time()
+    # Running summary, so the per-sample entries only need to be kept for CSV export.
+    summary = {"count": 0, "t_min": None, "t_max": None, "t_sum": 0.0, "last": None}
+    failures = 0
+    next_t = time.monotonic()
+    end_t = next_t + duration
+    # Read the log page directly when permitted; otherwise fall back to nvme-cli per sample.
+    reader = SmartReader(namespace)
     
     try:
-        while time.time() - start_time < duration:
+        while time.monotonic() < end_t:
             try:
-                raw_health = get_nvme_health(namespace)
-                if raw_health.startswith("Error:"):
-                    print(f"Error getting health data: {raw_health}")
-                    time.sleep(interval)
-                    continue
-                
-                health_data = json.loads(raw_health)
+                health_data = None
+                if reader:
+                    try:
+                        health_data = reader.sample()
+                    except OSError:
+                        reader.close()
+                if health_data is None:
+                    raw_health = get_nvme_health(namespace)
+                    if raw_health.startswith("Error:"):
+                        print(f"Error getting health data: {raw_health}")
+                        failures += 1
+                        next_t = _backoff_sleep(failures, interval, end_t)
+                        continue
+                    health_data = _json_loads(raw_health)
                 
                 log_entry = {
                     "time": time_hms(),
@@ -44,32 +66,47 @@ def monitor_smart_data(namespace: str, interval: int = 5, duration: int = 30):
                     "unsafe_shutdowns": health_data.get("unsafe_shutdowns", 0)
                 }
                 
-                logs.append(log_entry)
+                temp = log_entry["temperature"]
+                if summary["count"]:
+                    summary["t_min"] = min(summary["t_min"], temp)
+                    summary["t_max"] = max(summary["t_max"], temp)
+                else:
+                    summary["t_min"] = summary["t_max"] = temp
+                summary["t_sum"] += temp
+                summary["count"] += 1
+                summary["last"] = log_entry
+                if keep_logs:
+                    logs.append(log_entry)
+                failures = 0
                 
                 print(f"[{log_entry['time']}] Temp: {log_entry['temperature']}°C, "
                       f"Used: {log_entry['percentage_used']}%, "
                       f"Errors: {log_entry['media_errors']}, "
                       f"Warnings: {log_entry['critical_warnings']}")
                 
-                time.sleep(interval)
+                next_t = sleep_to_next_tick(next_t, interval)
                 
-            except json.JSONDecodeError:
+            except ValueError:  # json/orjson decode errors are ValueErrors
                 print(f"[{time_hms()}] Failed to parse SMART data")
-                time.sleep(interval)
+                failures += 1
+                next_t = _backoff_sleep(failures, interval, end_t)
             except KeyboardInterrupt:
                 print("\nMonitoring stopped by user")
                 break
             except Exception as e:
                 print(f"[{time_hms()}] Error: {e}")
-                time.sleep(interval)
+                failures += 1
+                next_t = _backoff_sleep(failures, interval, end_t)
     
     except KeyboardInterrupt:
         print("\nMonitoring stopped by user")
+    finally:
+        reader.close()
     
-    return logs
+    return logs, summary
 
 def select_namespace():
-    controllers, namespaces = list_nvme_devices_nvme_cli()
+    controllers, namespaces = list_nvme_devices()
     
     if not namespaces:
         print("No NVMe namespaces found")
@@ -106,16 +143,16 @@ def main():
             print("No namespace selected")
             return
     
-    logs = monitor_smart_data(namespace, args.interval, args.duration)
+    logs, summary = monitor_smart_data(namespace, args.interval, args.duration, keep_logs=args.csv)
     
-    if logs:
-        print(f"\nCollected {len(logs)} SMART readings")
+    if summary["count"]:
+        print(f"\nCollected {summary['count']} SMART readings")
         
         print_section("Summary")
-        temps = [log['temperature'] for log in logs]
-        print(f"Temperature: Min={min(temps)}°C, Max={max(temps)}°C, Avg={sum(temps)/len(temps):.1f}°C")
+        print(f"Temperature: Min={summary['t_min']}°C, Max={summary['t_max']}°C, "
+              f"Avg={summary['t_sum'] / summary['count']:.1f}°C")
         
-        final_log = logs[-1]
+        final_log = summary["last"]
         print(f"Final percentage used: {final_log['percentage_used']}%")
         print(f"Media errors: {final_log['media_errors']}")
         print(f"Critical warnings: {final_log['critical_warnings']}")
@@ -4,20 +4,23 @@ NVMe Critical Health Monitoring with CSV Export
 Focused on critical SSD health metrics with automatic CSV export
 """
 
+import os
 import sys
-import json
+import csv
 import time
 import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, print_section, list_nvme_devices_nvme_cli, 
-                         get_nvme_health, time_hms, controller_from_ns, run_cmd, get_temperature_celsius)
-from utils.csv_export import save_health_data_csv, get_csv_filepath, append_to_csv
+from utils.common import (print_header, print_section, list_nvme_devices, 
+                         get_nvme_health, time_hms, controller_from_ns, get_temperature_celsius,
+                         identify_controller, sleep_to_next_tick, _json_loads)
+from utils.csv_export import save_health_data_csv, get_csv_filepath, ensure_csv_dir
+
+_BATCH_ROWS = 16  # rows collected before a writerows() + flush in continuous mode
 
 def get_device_identification(namespace: str):
     ctrl = controller_from_ns(namespace)
-    id_ctrl_output = run_cmd(f"nvme id-ctrl -o json {ctrl}")
     
     device_info = {
         'namespace': namespace,
@@ -28,7 +31,7 @@ def get_device_identification(namespace: str):
     }
     
     try:
-        id_ctrl_json = json.loads(id_ctrl_output)
+        id_ctrl_json = identify_controller(ctrl)
         device_info['model'] = id_ctrl_json.get("mn", "unknown").strip()
         device_info['serial'] = id_ctrl_json.get("sn", "unknown").strip()
         device_info['firmware'] = id_ctrl_json.get("fr", "unknown").strip()
@@ -43,7 +46,7 @@ def get_critical_health_metrics(namespace: str):
         return None, raw_health
     
     try:
-        health_data = json.loads(raw_health)
+        health_data = _json_loads(raw_health)
         
         metrics = {
             "time": time_hms(),
@@ -58,25 +61,26 @@ def get_critical_health_metrics(namespace: str):
         }
         
         return metrics, None
-    except json.JSONDecodeError as e:
+    except ValueError as e:  # json/orjson decode errors are ValueErrors
         return None, f"JSON decode error: {e}"
 
 def assess_health_status(metrics):
+    # metrics always comes from get_critical_health_metrics, which fills every key.
     warnings = []
     
-    temp = metrics.get('temperature', 0)
+    temp = metrics['temperature']
     if temp > 70:
         warnings.append(f"High temperature: {temp}°C")
     
-    used = metrics.get('percentage_used', 0)
+    used = metrics['percentage_used']
     if used > 80:
         warnings.append(f"High wear level: {used}%")
     
-    errors = metrics.get('media_errors', 0)
+    errors = metrics['media_errors']
     if errors > 0:
         warnings.append(f"Media errors detected: {errors}")
     
-    critical = metrics.get('critical_warnings', 0)
+    critical = metrics['critical_warnings']
     if critical > 0:
         warnings.append(f"Critical warnings: {critical}")
     
@@ -96,51 +100,73 @@ def continuous_monitoring(namespace: str, csv_path: str, interval: int = 10):
                   'temperature_c', 'percentage_used', 'media_errors', 'critical_warnings',
                   'power_on_hours', 'unsafe_shutdowns', 'data_units_read', 'data_units_written']
     
-    try:
-        while True:
-            metrics, error = get_critical_health_metrics(namespace)
+    # Keep the CSV open for the whole run: rows are batched and written with writerows()
+    # every few samples (and on exit, including Ctrl+C) instead of reopening the file per row.
+    csv_path = ensure_csv_dir(csv_path)
+    new_file = not os.path.exists(csv_path)
+    batch = []
+    next_t = time.monotonic()
+    with open(csv_path, "a", newline="", encoding="utf-8", buffering=1 << 16) as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        if new_file:
+            writer.writeheader()
+
+        def flush_batch():
+            try:
+                writer.writerows(batch)
+                f.flush()
+            except Exception as e:
+                print(f"  CSV Error: {e}")
+            batch.clear()
+
+        try:
+            while True:
+                metrics, error = get_critical_health_metrics(namespace)
             
-            if error:
-                print(f"[{time_hms()}] Error: {error}")
-                time.sleep(interval)
-                continue
+                if error:
+                    print(f"[{time_hms()}] Error: {error}")
+                    next_t = sleep_to_next_tick(next_t, interval)
+                    continue
             
-            warnings = assess_health_status(metrics)
+                warnings = assess_health_status(metrics)
             
-            status_indicator = "⚠️ " if warnings else "✅"
-            print(f"[{metrics['time']}] {status_indicator} "
-                  f"Temp: {metrics['temperature']}°C, "
-                  f"Used: {metrics['percentage_used']}%, "
-                  f"Errors: {metrics['media_errors']}")
+                status_indicator = "⚠️ " if warnings else "✅"
+                print(f"[{metrics['time']}] {status_indicator} "
+                      f"Temp: {metrics['temperature']}°C, "
+                      f"Used: {metrics['percentage_used']}%, "
+                      f"Errors: {metrics['media_errors']}")
             
-            if warnings:
-                for warning in warnings:
-                    print(f"  WARNING: {warning}")
+                if warnings:
+                    for warning in warnings:
+                        print(f"  WARNING: {warning}")
             
-            csv_row = {
-                'timestamp': metrics['time'],
-                'device': device_info['namespace'],
-                'controller': device_info['controller'],
-                'model': device_info['model'],
-                'serial': device_info['serial'],
-                'temperature_c': metrics['temperature'],
-                'percentage_used': metrics['percentage_used'],
-                'media_errors': metrics['media_errors'],
-                'critical_warnings': metrics['critical_warnings'],
-                'power_on_hours': metrics['power_on_hours'],
-                'unsafe_shutdowns': metrics['unsafe_shutdowns'],
-                'data_units_read': metrics['data_units_read'],
-                'data_units_written': metrics['data_units_written']
-            }
+                csv_row = {
+                    'timestamp': metrics['time'],
+                    'device': device_info['namespace'],
+                    'controller': device_info['controller'],
+                    'model': device_info['model'],
+                    'serial': device_info['serial'],
+                    'temperature_c': metrics['temperature'],
+                    'percentage_used': metrics['percentage_used'],
+                    'media_errors': metrics['media_errors'],
+                    'critical_warnings': metrics['critical_warnings'],
+                    'power_on_hours': metrics['power_on_hours'],
+                    'unsafe_shutdowns': metrics['unsafe_shutdowns'],
+                    'data_units_read': metrics['data_units_read'],
+                    'data_units_written': metrics['data_units_written']
+                }
             
-            append_result = append_to_csv(csv_row, csv_path, fieldnames)
-            if "Error" in append_result:
-                print(f"  CSV Error: {append_result}")
+                batch.append(csv_row)
+                if len(batch) >= _BATCH_ROWS:
+                    flush_batch()
             
-            time.sleep(interval)
+                next_t = sleep_to_next_tick(next_t, interval)
             
-    except KeyboardInterrupt:
-        print(f"\nMonitoring stopped. Data saved to: {csv_path}")
+        except KeyboardInterrupt:
+            print(f"\nMonitoring stopped. Data saved to: {csv_path}")
+        finally:
+            if batch:
+                flush_batch()
 
 def single_snapshot(namespace: str, csv_path: str):
     print_header(f"Health Snapshot: {namespace}")
@@ -178,7 +204,7 @@ def single_snapshot(namespace: str, csv_path: str):
     print(f"\nCSV Export: {result}")
 
 def select_namespace():
-    controllers, namespaces = list_nvme_devices_nvme_cli()
+    controllers, namespaces = list_nvme_devices()
     
     if not namespaces:
         print("No NVMe namespaces found")
@@ -4,14 +4,16 @@ NVMe FIO Performance Testing Sample
 Single workload performance testing with CSV export
 """
 
+import os
 import sys
-import json
+import shlex
 import argparse
+import subprocess
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, print_section, list_nvme_devices_nvme_cli, 
-                         run_cmd, controller_from_ns, check_sudo_access)
+from utils.common import (print_header, print_section, list_nvme_devices, 
+                         controller_from_ns, check_sudo_access, _json_loads)
 from utils.csv_export import save_performance_data_csv, get_csv_filepath
 
 def run_fio_test(target: str, workload: str = "randread", runtime: int = 30, 
@@ -24,27 +26,34 @@ def run_fio_test(target: str, workload: str = "randread", runtime: int = 30,
     if not check_sudo_access():
         print("Warning: This test may require sudo access for direct device access")
     
-    fio_cmd = (
-        f"fio --name=nvme_perf_test --filename={target} "
-        f"--rw={workload} --bs={bs} --iodepth={iodepth} --runtime={runtime} "
-        f"--time_based=1 --ioengine={ioengine} --output-format=json --direct=1"
-    )
+    fio_argv = [
+        "fio", "--name=nvme_perf_test", f"--filename={target}",
+        f"--rw={workload}", f"--bs={bs}", f"--iodepth={iodepth}", f"--runtime={runtime}",
+        "--time_based=1", f"--ioengine={ioengine}", "--output-format=json", "--direct=1",
+    ]
+    if os.geteuid() != 0:
+        fio_argv = ["sudo", "-n"] + fio_argv
     
     print("Running FIO test...")
-    print(f"Command: {fio_cmd}\n")
+    print(f"Command: {shlex.join(fio_argv)}\n")
     
-    raw_output = run_cmd(fio_cmd, require_root=True)
-    
-    if raw_output.startswith("Error:"):
-        print(f"FIO test failed: {raw_output}")
+    # argv list (no shell); keep stdout as bytes and parse it once.
+    try:
+        result = subprocess.run(fio_argv, capture_output=True)
+    except OSError as e:
+        print(f"FIO test failed: Error: {e}")
+        return None
+    if result.returncode != 0:
+        print(f"FIO test failed: Error: {result.stderr.decode('utf-8', errors='replace').strip()}")
         return None
     
+    raw_output = result.stdout
     try:
-        fio_results = json.loads(raw_output)
-        return fio_results
-    except json.JSONDecodeError as e:
+        # fio may print warnings ahead of the JSON document
+        return _json_loads(raw_output[max(0, raw_output.find(b"{")):])
+    except ValueError as e:
         print(f"Failed to parse FIO output: {e}")
-        print(f"Raw output: {raw_output[:500]}...")
+        print(f"Raw output: {raw_output[:500].decode('utf-8', errors='replace')}...")
         return None
 
 def display_results(fio_results: dict, workload: str):
@@ -54,35 +63,42 @@ def display_results(fio_results: dict, workload: str):
     
     print_section("Performance Results")
     
+    # Workload class is fixed for the whole run; decide once, not per job.
+    wants_read = 'read' in workload
+    wants_write = 'write' in workload
+    wants_mixed = 'rw' in workload
+    
     for job in fio_results.get('jobs', []):
         read_data = job.get('read', {})
         write_data = job.get('write', {})
+        r_iops = read_data.get('iops', 0)
+        r_bw = read_data.get('bw', 0) / 1024
+        w_iops = write_data.get('iops', 0)
+        w_bw = write_data.get('bw', 0) / 1024
         
-        if workload in ['read', 'randread'] or 'read' in workload:
-            if read_data.get('iops', 0) > 0:
-                print(f"Read IOPS: {read_data['iops']:,.0f}")
-                print(f"Read Bandwidth: {read_data.get('bw', 0) / 1024:.2f} MB/s")
-                print(f"Read Latency (avg): {read_data.get('clat_ns', {}).get('mean', 0) / 1000:.2f} μs")
+        if wants_read and r_iops > 0:
+            print(f"Read IOPS: {r_iops:,.0f}")
+            print(f"Read Bandwidth: {r_bw:.2f} MB/s")
+            print(f"Read Latency (avg): {read_data.get('clat_ns', {}).get('mean', 0) / 1000:.2f} μs")
         
-        if workload in ['write', 'randwrite'] or 'write' in workload:
-            if write_data.get('iops', 0) > 0:
-                print(f"Write IOPS: {write_data['iops']:,.0f}")
-                print(f"Write Bandwidth: {write_data.get('bw', 0) / 1024:.2f} MB/s")
-                print(f"Write Latency (avg): {write_data.get('clat_ns', {}).get('mean', 0) / 1000:.2f} μs")
+        if wants_write and w_iops > 0:
+            print(f"Write IOPS: {w_iops:,.0f}")
+            print(f"Write Bandwidth: {w_bw:.2f} MB/s")
+            print(f"Write Latency (avg): {write_data.get('clat_ns', {}).get('mean', 0) / 1000:.2f} μs")
         
-        if 'randrw' in workload or 'rw' in workload:
-            if read_data.get('iops', 0) > 0:
-                print(f"Read IOPS: {read_data['iops']:,.0f}")
-                print(f"Read Bandwidth: {read_data.get('bw', 0) / 1024:.2f} MB/s")
-            if write_data.get('iops', 0) > 0:
-                print(f"Write IOPS: {write_data['iops']:,.0f}")
-                print(f"Write Bandwidth: {write_data.get('bw', 0) / 1024:.2f} MB/s")
+        if wants_mixed:
+            if r_iops > 0:
+                print(f"Read IOPS: {r_iops:,.0f}")
+                print(f"Read Bandwidth: {r_bw:.2f} MB/s")
+            if w_iops > 0:
+                print(f"Write IOPS: {w_iops:,.0f}")
+                print(f"Write Bandwidth: {w_bw:.2f} MB/s")
         
         runtime_ms = job.get('runtime', 0)
         print(f"Actual Runtime: {runtime_ms / 1000:.1f}s")
 
 def select_target():
-    controllers, namespaces = list_nvme_devices_nvme_cli()
+    controllers, namespaces = list_nvme_devices()
     
     if not namespaces:
         print("No NVMe namespaces found")
@@ -92,7 +108,7 @@ def select_target():
     all_targets = namespaces + controllers
     
     for i, target in enumerate(all_targets, 1):
-        if target in namespaces:
+        if i <= len(namespaces):
             ctrl = controller_from_ns(target)
             print(f"{i}. {target} (Namespace on {ctrl})")
         else:
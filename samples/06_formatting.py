@@ -10,7 +10,7 @@ import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, print_section, list_nvme_devices_nvme_cli, 
+from utils.common import (print_header, print_section, list_nvme_devices, 
                          run_cmd, controller_from_ns, check_sudo_access, confirm_action)
 
 def get_namespace_info(namespace: str):
@@ -97,7 +97,7 @@ def list_lba_formats(namespace: str):
         print("Could not retrieve LBA format information")
 
 def select_namespace():
-    controllers, namespaces = list_nvme_devices_nvme_cli()
+    controllers, namespaces = list_nvme_devices()
     
     if not namespaces:
         print("No NVMe namespaces found")
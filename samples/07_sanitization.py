@@ -10,7 +10,7 @@ import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, print_section, list_nvme_devices_nvme_cli, 
+from utils.common import (print_header, print_section, list_nvme_devices, 
                          run_cmd, controller_from_ns, check_sudo_access, confirm_action)
 
 def get_controller_info(controller: str):
@@ -126,7 +126,7 @@ def check_sanitize_status(controller: str):
         print(f"Error checking status: {status_result}")
 
 def select_controller():
-    controllers, _ = list_nvme_devices_nvme_cli()
+    controllers, _ = list_nvme_devices()
     
     if not controllers:
         print("No NVMe controllers found")
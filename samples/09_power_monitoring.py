@@ -11,12 +11,14 @@ import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, print_section, list_nvme_devices_nvme_cli, 
+from utils.common import (print_header, print_section, list_nvme_devices, 
                          run_cmd, controller_from_ns, time_hms)
 from utils.csv_export import save_to_csv, get_csv_filepath
 
+_PWR_RE = re.compile(r"Current value:\s*(0x[0-9A-Fa-f]+|\d+)")
+
 def parse_power_value(txt: str):
-    m = re.search(r"Current value:\s*(0x[0-9A-Fa-f]+|\d+)", txt)
+    m = _PWR_RE.search(txt)
     if not m:
         return None
     token = m.group(1)
@@ -115,7 +117,7 @@ def set_power_state(controller: str, power_state: int):
         return True
 
 def select_controller():
-    controllers, _ = list_nvme_devices_nvme_cli()
+    controllers, _ = list_nvme_devices()
     
     if not controllers:
         print("No NVMe controllers found")
@@ -10,7 +10,7 @@ import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, print_section, list_nvme_devices_nvme_cli, 
+from utils.common import (print_header, print_section, list_nvme_devices, 
                          run_cmd, controller_from_ns, time_hms, cmd_exists)
 from utils.csv_export import save_to_csv, get_csv_filepath
 
@@ -147,7 +147,7 @@ def show_telemetry_summary(telemetry_logs):
         print(f"Average temperature: {sum(all_temps)/len(all_temps):.1f}°C")
 
 def select_controller():
-    controllers, _ = list_nvme_devices_nvme_cli()
+    controllers, _ = list_nvme_devices()
     
     if not controllers:
         print("No NVMe controllers found")
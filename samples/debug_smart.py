@@ -8,11 +8,11 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, list_nvme_devices_nvme_cli, 
+from utils.common import (print_header, list_nvme_devices, 
                          debug_smart_data, controller_from_ns)
 
 def select_namespace():
-    controllers, namespaces = list_nvme_devices_nvme_cli()
+    controllers, namespaces = list_nvme_devices()
     
     if not namespaces:
         print("No NVMe namespaces found")
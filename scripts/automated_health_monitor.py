@@ -15,7 +15,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.common import (print_header, list_nvme_devices_nvme_cli, 
+from utils.common import (print_header, list_nvme_devices, clear_device_list_cache,
                          get_nvme_health, timestamp, get_temperature_celsius)
 from utils.csv_export import save_health_data_csv, get_csv_filepath, append_to_csv
 
@@ -172,7 +172,8 @@ class NVMeHealthMonitor:
     
     def monitor_single_check(self):
         """Perform a single monitoring check on all devices"""
-        controllers, namespaces = list_nvme_devices_nvme_cli()
+        clear_device_list_cache()  # every check rescans, so hotplugged drives are picked up
+        controllers, namespaces = list_nvme_devices()
         
         if not namespaces:
             print("No NVMe namespaces found for monitoring")
@@ -227,7 +228,7 @@ class NVMeHealthMonitor:
         """Generate a health report from recent CSV data"""
         print(f"Generating health report for last {days} days...")
         
-        controllers, namespaces = list_nvme_devices_nvme_cli()
+        controllers, namespaces = list_nvme_devices()
         if not namespaces:
             print("No NVMe namespaces found")
             return
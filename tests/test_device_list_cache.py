@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils import common
+
+
+def _fake_nvme_list(monkeypatch, paths):
+    monkeypatch.setattr(common, "nvme_list_json",
+                        lambda: {"Devices": [{"DevicePath": p} for p in paths]})
+
+
+def test_repeat_call_shares_one_scan(monkeypatch):
+    common.clear_device_list_cache()
+    _fake_nvme_list(monkeypatch, ["/dev/nvme0n1"])
+    first = common.list_nvme_devices_nvme_cli()
+    _fake_nvme_list(monkeypatch, ["/dev/nvme0n1", "/dev/nvme1n1"])
+    assert common.list_nvme_devices_nvme_cli() == first
+
+
+def test_second_enumeration_sees_new_devices_after_ttl(monkeypatch):
+    common.clear_device_list_cache()
+    now = [1000.0]
+    monkeypatch.setattr(common.time, "monotonic", lambda: now[0])
+    _fake_nvme_list(monkeypatch, ["/dev/nvme0n1"])
+    assert common.list_nvme_devices_nvme_cli() == (("/dev/nvme0",), ("/dev/nvme0n1",))
+
+    _fake_nvme_list(monkeypatch, ["/dev/nvme0n1", "/dev/nvme1n1", "/dev/nvme1n2"])
+    now[0] += common._DEVICE_LIST_TTL
+    assert common.list_nvme_devices_nvme_cli() == (
+        ("/dev/nvme0", "/dev/nvme1"), ("/dev/nvme0n1", "/dev/nvme1n1", "/dev/nvme1n2"))
+
+
+def test_clear_forces_rescan(monkeypatch):
+    common.clear_device_list_cache()
+    _fake_nvme_list(monkeypatch, ["/dev/nvme0n1"])
+    common.list_nvme_devices_nvme_cli()
+    _fake_nvme_list(monkeypatch, ["/dev/nvme0n1", "/dev/nvme1n1"])
+    common.clear_device_list_cache()
+    assert common.list_nvme_devices_nvme_cli()[1] == ("/dev/nvme0n1", "/dev/nvme1n1")
+
+
+def test_list_nvme_devices_prefers_sysfs(monkeypatch):
+    common.clear_device_list_cache()
+    _fake_nvme_list(monkeypatch, ["/dev/nvme9n1"])
+    monkeypatch.setattr(common, "list_nvme_devices_sysfs",
+                        lambda: (("/dev/nvme0",), ("/dev/nvme0n1",)))
+    assert common.list_nvme_devices() == (("/dev/nvme0",), ("/dev/nvme0n1",))
+
+    monkeypatch.setattr(common, "list_nvme_devices_sysfs", lambda: None)
+    assert common.list_nvme_devices() == (("/dev/nvme9",), ("/dev/nvme9n1",))
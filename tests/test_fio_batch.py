@@ -0,0 +1,42 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location("nvme_qa", Path(__file__).parent.parent / "nvme-qa.py")
+nvme_qa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(nvme_qa)
+
+
+def _job_sections(monkeypatch, **kwargs):
+    seen = {}
+
+    async def fake_run_fio_json(argv, cwd=None):
+        seen["jobfile"] = Path(argv[-1]).read_text()
+        return {"jobs": []}
+
+    monkeypatch.setattr(nvme_qa, "run_fio_json", fake_run_fio_json)
+    asyncio.run(nvme_qa.run_fio_batch(runtime=5, iodepth=8, bs="4k", ioengine="io_uring", **kwargs))
+    sections = {}
+    for block in seen["jobfile"].strip().split("\n\n"):
+        head, *body = block.splitlines()
+        sections[head.strip("[]")] = body
+    return sections
+
+
+def test_size_only_on_filesystem_jobs(monkeypatch):
+    sections = _job_sections(
+        monkeypatch,
+        targets={"randread": "/mnt/nvme/fio_randread.dat", "randwrite": "/dev/nvme0n1"},
+        on_fs={"randread": True, "randwrite": False},
+        file_size="8G",
+        engine_opts={"randread": ["direct=1"], "randwrite": ["direct=1", "hipri=1"]},
+    )
+    assert not any(l.startswith("size=") for l in sections["global"])
+    assert "size=8G" in sections["randread"]
+    assert not any(l.startswith("size=") for l in sections["randwrite"])
+    assert "hipri=1" in sections["randwrite"] and "hipri=1" not in sections["randread"]
+
+
+def test_raw_targets_get_no_size(monkeypatch):
+    sections = _job_sections(monkeypatch, targets={"read": "/dev/nvme0n1"}, file_size="8G")
+    assert not any(l.startswith("size=") for lines in sections.values() for l in lines)
@@ -0,0 +1,57 @@
+import importlib.util
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils import common
+
+_spec = importlib.util.spec_from_file_location("nvme_qa", Path(__file__).parent.parent / "nvme-qa.py")
+nvme_qa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(nvme_qa)
+
+_CSI = re.compile("\x1B\\[[0-9;?]*[ -/]*[@-~]")
+
+
+def reference(s):
+    """The original per-character sanitizer the regex versions must match."""
+    s = _CSI.sub("", s)
+    if "\r" in s:
+        s = "\n".join(line.split("\r")[-1] for line in s.splitlines())
+    out = []
+    for ch in s:
+        if ch == "\b":
+            if out:
+                out.pop()
+        else:
+            out.append(ch)
+    return "".join(out).replace("\x00", "").strip()
+
+
+SANITIZERS = [common.sanitize_cmd_output, nvme_qa.sanitize_cmd_output]
+
+
+def test_lone_cr_starts_a_new_line():
+    for f in SANITIZERS:
+        assert f("Alloc 10%\rAlloc 20%\rdone") == "Alloc 10%\nAlloc 20%\ndone"
+
+
+def test_crlf_becomes_lf():
+    for f in SANITIZERS:
+        assert f("a\r\nb\r\n") == "a\nb"
+
+
+def test_nul_is_counted_by_backspace():
+    # The NUL is removed last, so the backspace deletes it rather than "b".
+    for f in SANITIZERS:
+        assert f("ab\x00\bc") == "abc"
+
+
+def test_matches_reference_on_random_input():
+    rng = random.Random(0)
+    alphabet = ["a", "b", "\r", "\n", "\r\n", "\b", "\x00", "\x1b[2K", " "]
+    for _ in range(3000):
+        s = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+        for f in SANITIZERS:
+            assert f(s) == reference(s), repr(s)
@@ -0,0 +1,65 @@
+import importlib.util
+import json
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location("nvme_qa", Path(__file__).parent.parent / "nvme-qa.py")
+nvme_qa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(nvme_qa)
+
+# `nvme sanitize-log /dev/nvme0 -o json` as printed by nvme-cli 1.x and 2.x:
+# the log sits under the device name and sstat.status is a "(N) text" string.
+NVME_CLI_1X = """{
+  "nvme0" : {
+    "sprog" : 32768,
+    "sstat" : {
+      "global_erased" : 0,
+      "no_cmplted_passes" : 0,
+      "status" : "(2) Sanitize in Progress."
+    },
+    "cdw10_info" : 2,
+    "time_over_write" : 4294967295,
+    "time_block_erase" : 4294967295,
+    "time_crypto_erase" : 4294967295
+  }
+}"""
+
+NVME_CLI_2X = """{
+  "nvme0":{
+    "sprog":65535,
+    "sstat":{
+      "global_erased":1,
+      "no_cmplted_passes":1,
+      "status":"(1) The most recent sanitize operation completed successfully."
+    },
+    "cdw10_info":2,
+    "time_over_write":4294967295,
+    "time_block_erase":4294967295,
+    "time_crypto_erase":4294967295,
+    "time_over_write_no_dealloc":4294967295,
+    "time_block_erase_no_dealloc":4294967295,
+    "time_crypto_erase_no_dealloc":4294967295
+  }
+}"""
+
+
+def test_nvme_cli_1x_in_progress():
+    assert nvme_qa.parse_sanitize_state(json.loads(NVME_CLI_1X)) == nvme_qa._SSTAT_IN_PROGRESS
+
+
+def test_nvme_cli_2x_completed():
+    assert nvme_qa.parse_sanitize_state(json.loads(NVME_CLI_2X)) == 1
+
+
+def test_numeric_sstat_forms():
+    assert nvme_qa.parse_sanitize_state({"sprog": 0, "sstat": 0x102}) == 2
+    assert nvme_qa.parse_sanitize_state({"sstat": {"status": 3}}) == 3
+
+
+def test_unparseable_log_is_none():
+    assert nvme_qa.parse_sanitize_state("Error: permission denied") is None
+    assert nvme_qa.parse_sanitize_state({"nvme0": {"sstat": {"status": "unknown"}}}) is None
+
+
+def test_sanitize_state_reads_nvme_cli(monkeypatch):
+    monkeypatch.setattr(nvme_qa, "run_cmd", lambda *a, **k: NVME_CLI_1X)
+    assert nvme_qa.sanitize_state("/dev/nvme0") == nvme_qa._SSTAT_IN_PROGRESS
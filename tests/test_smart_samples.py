@@ -0,0 +1,34 @@
+import importlib.util
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+_spec = importlib.util.spec_from_file_location("nvme_qa", Path(__file__).parent.parent / "nvme-qa.py")
+nvme_qa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(nvme_qa)
+
+
+def _smart_page(media_errors):
+    page = bytearray(512)
+    struct.pack_into("<BH2xB", page, 0, 0, 310, 3)
+    struct.pack_into("<QQ", page, 160, media_errors & (2**64 - 1), media_errors >> 64)
+    return page
+
+
+def test_media_errors_above_64_bits_are_kept():
+    big = 2**64 + 5
+    j = nvme_qa._decode_smart_log(_smart_page(big))
+    assert j["media_errors"] == big
+
+    logs = np.empty(2, dtype=nvme_qa.SMART_DTYPE)
+    logs[0] = ("00:00:01", 36.85, j["percentage_used"], j["media_errors"], j["critical_warning"])
+    logs[1] = ("00:00:02", 36.85, 3, big + 1, 0)
+    assert logs["media_errors"].tolist() == [big, big + 1]
+
+    records = json.loads(json.dumps(logs, default=nvme_qa._json_default))
+    assert records[0]["media_errors"] == big
+
+    _, vals = nvme_qa._lttb(logs["media_errors"], 100)
+    assert vals.dtype == np.float64
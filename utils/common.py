@@ -9,10 +9,28 @@ import json
 import subprocess
 import re
 import shlex
+import shutil
+import time
+import ctypes
+import fcntl
+import struct
+from functools import lru_cache
 from datetime import datetime
 from typing import Any, Dict, List, Tuple, Optional
 
+# Optional orjson (faster parsing of large nvme-cli / fio JSON)
+try:
+    import orjson  # type: ignore
+    HAVE_ORJSON = True
+except Exception:
+    HAVE_ORJSON = False
+
+def _json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes, via orjson when available."""
+    return orjson.loads(data) if HAVE_ORJSON else json.loads(data)
+
 _ANSI_RE = re.compile(r"\x1B\[[0-9;?]*[ -/]*[@-~]")
+_BS_RUN_RE = re.compile(r"(\x08+)")
 
 def _strip_ansi(s: str) -> str:
     if not isinstance(s, str):
@@ -22,75 +40,139 @@ def _strip_ansi(s: str) -> str:
 def _normalize_cr(s: str) -> str:
     if not s or "\r" not in s:
         return s
-    fixed_lines: List[str] = []
-    for line in s.splitlines(keepends=False):
-        if "\r" in line:
-            fixed_lines.append(line.split("\r")[-1])
-        else:
-            fixed_lines.append(line)
-    return "\n".join(fixed_lines)
+    # A lone CR is a line break for splitlines(), so redraws stay on separate lines.
+    return "\n".join(s.splitlines())
 
 def _apply_backspaces(s: str) -> str:
     if not s or "\b" not in s:
         return s
-    out_chars: List[str] = []
-    for ch in s:
-        if ch == "\b":
-            if out_chars:
-                out_chars.pop()
+    # Single pass: each run of k backspaces drops the last k kept chars (linear time).
+    out: List[str] = []
+    for i, part in enumerate(_BS_RUN_RE.split(s)):
+        if i % 2:
+            del out[-len(part):]
         else:
-            out_chars.append(ch)
-    return "".join(out_chars)
+            out.extend(part)
+    return "".join(out)
 
 def sanitize_cmd_output(s: str) -> str:
     if not isinstance(s, str):
         return s
+    if "\x1b" not in s and "\r" not in s and "\b" not in s and "\x00" not in s:
+        return s.strip()  # common case: plain output, no regex passes at all
     s = _strip_ansi(s)
     s = _normalize_cr(s)
     s = _apply_backspaces(s)
-    return s.replace("\x00", "").strip()
+    return s.replace("\x00", "").strip()  # NULs go last so a '\b' still counts them
 
+@lru_cache(maxsize=None)
 def cmd_exists(name: str) -> bool:
-    return subprocess.call(f"command -v {shlex.quote(name)} >/dev/null 2>&1", shell=True) == 0
+    # PATH lookup in-process (no shell fork), memoized for the life of the sample.
+    return shutil.which(name) is not None
 
-def run_cmd(cmd: str, require_root: bool = False) -> str:
+def run_argv(argv: List[str], require_root: bool = False) -> str:
+    # argv list, no /bin/sh in between: one fork per call and nothing to shell-escape.
+    if require_root and os.geteuid() != 0:
+        argv = ["sudo", "-n", *argv]
     try:
-        if require_root and os.geteuid() != 0:
-            cmd = f"sudo -n {cmd}"
-        result = subprocess.run(cmd, shell=True, text=True, capture_output=True, check=True)
-        return sanitize_cmd_output(result.stdout)
+        # Capture raw bytes and decode once; sanitize_cmd_output normalizes newlines.
+        result = subprocess.run(argv, capture_output=True, check=True)
+        return sanitize_cmd_output(result.stdout.decode("utf-8", errors="replace"))
     except subprocess.CalledProcessError as e:
-        return f"Error: {sanitize_cmd_output(e.stderr)}"
+        return f"Error: {sanitize_cmd_output(e.stderr.decode('utf-8', errors='replace'))}"
+    except OSError as e:
+        return f"Error: {argv[0]}: {e.strerror}"
+
+def run_cmd(cmd: str, require_root: bool = False) -> str:
+    # Kept for string call sites; none rely on shell syntax, so split and exec directly.
+    return run_argv(shlex.split(cmd), require_root)
 
 def timestamp() -> str:
     return datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
 def time_hms() -> str:
-    return datetime.now().strftime("%H:%M:%S")
+    # Called once per monitor sample: time.strftime formats the C struct tm directly,
+    # without building a datetime object (~6x cheaper).
+    return time.strftime("%H:%M:%S")
+
+def sleep_to_next_tick(next_t: float, interval: float) -> float:
+    """
+    Sleep until the next fixed-rate tick after monotonic time `next_t` and return it, so
+    per-sample work doesn't accumulate as drift. After an overrun the grid restarts
+    from now instead of firing catch-up samples back-to-back.
+    """
+    next_t += interval
+    delay = next_t - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+        return next_t
+    return time.monotonic()
 
 def nvme_list_json() -> Dict[str, Any]:
-    raw = run_cmd("nvme list -o json")
+    raw = run_argv(["nvme", "list", "-o", "json"])
     try:
-        return json.loads(raw)
+        return _json_loads(raw)
     except Exception:
         return {}
 
-def list_nvme_devices_nvme_cli() -> Tuple[List[str], List[str]]:
+_SYSFS_CTRL_RE = re.compile(r"nvme\d+")
+_SYSFS_NS_RE = re.compile(r"nvme\d+n\d+")  # excludes hidden multipath paths (nvmeXcYnZ)
+
+def list_nvme_devices() -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    (controllers, namespaces) as /dev paths. Reads sysfs first (no fork, so every call
+    is a fresh scan that sees hotplug) and falls back to `nvme list` when sysfs shows
+    no controllers.
+    """
+    return list_nvme_devices_sysfs() or list_nvme_devices_nvme_cli()
+
+def list_nvme_devices_sysfs() -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    """Enumerate controllers and namespaces from sysfs; None if nothing is visible there."""
+    try:
+        ctrls = [f"/dev/{d}" for d in os.listdir("/sys/class/nvme") if _SYSFS_CTRL_RE.fullmatch(d)]
+        nss = [f"/dev/{d}" for d in os.listdir("/sys/block") if _SYSFS_NS_RE.fullmatch(d)]
+    except OSError:
+        return None
+    if not ctrls:
+        return None
+    return tuple(sorted(ctrls)), tuple(sorted(nss))
+
+# Short-lived: back-to-back lookups in one sample (menu, then the work after it) share
+# a single `nvme list`, while long-running monitors still see hotplug/namespace changes.
+_DEVICE_LIST_TTL = 5.0  # seconds
+_DEVICE_LIST_CACHE: Dict[str, Any] = {}
+
+def clear_device_list_cache() -> None:
+    """Force the next `nvme list` enumeration to rescan."""
+    _DEVICE_LIST_CACHE.clear()
+
+def list_nvme_devices_nvme_cli() -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Enumerate via `nvme list -o json`; prefer list_nvme_devices(), which tries sysfs first."""
+    # Callers get immutable tuples since the cached result is shared.
+    now = time.monotonic()
+    hit = _DEVICE_LIST_CACHE.get("nvme_list")
+    if hit and now - hit[0] < _DEVICE_LIST_TTL:
+        return hit[1]
     j = nvme_list_json()
     ctrls: set[str] = set()
     nss: List[str] = []
     for dev in j.get("Devices", []):
         dp = dev.get("DevicePath")
         if isinstance(dp, str) and dp.startswith("/dev/nvme"):
-            if re.search(r"n\d+$", dp):
+            if _NS_SUFFIX_RE.search(dp):
                 nss.append(dp)
-                ctrls.add(re.sub(r"n\d+$", "", dp))
+                ctrls.add(controller_from_ns(dp))
             else:
                 ctrls.add(dp)
-    return sorted(ctrls), nss
+    result = (tuple(sorted(ctrls)), tuple(nss))
+    _DEVICE_LIST_CACHE["nvme_list"] = (now, result)
+    return result
 
+_NS_SUFFIX_RE = re.compile(r"n\d+$")
+
+@lru_cache(maxsize=256)
 def controller_from_ns(ns: str) -> str:
-    return re.sub(r"n\d+$", "", ns)
+    return _NS_SUFFIX_RE.sub("", ns)
 
 def re_filter(values: List[str], include_regex: str, exclude_regex: str) -> List[str]:
     inc = re.compile(include_regex) if include_regex else None
@@ -105,7 +187,93 @@ def re_filter(values: List[str], include_regex: str, exclude_regex: str) -> List
     return out
 
 def get_nvme_health(ns: str) -> str:
-    return run_cmd(f"nvme smart-log -o json {ns}")
+    return run_argv(["nvme", "smart-log", "-o", "json", ns])
+
+# struct nvme_passthru_cmd (linux/nvme_ioctl.h) and NVME_IOCTL_ADMIN_CMD = _IOWR('N', 0x41, <72 bytes>)
+_NVME_ADMIN_CMD = struct.Struct("<BBHIIIQQII6III")
+_NVME_IOCTL_ADMIN_CMD = (3 << 30) | (_NVME_ADMIN_CMD.size << 16) | (ord("N") << 8) | 0x41
+_SMART_LOG_LEN = 512
+_SMART_HEAD = struct.Struct("<BH2xB")  # critical warning, composite temp (K), percentage used
+_SMART_U128 = struct.Struct("<QQ")
+
+def _nvme_admin(fd: int, opcode: int, nsid: int = 0, cdw10: int = 0,
+                addr: int = 0, data_len: int = 0) -> int:
+    """One admin passthrough command; returns completion dword 0, raises OSError on failure."""
+    cmd = bytearray(_NVME_ADMIN_CMD.pack(opcode, 0, 0, nsid, 0, 0, 0, addr, 0, data_len,
+                                         cdw10, 0, 0, 0, 0, 0, 0, 0))
+    status = fcntl.ioctl(fd, _NVME_IOCTL_ADMIN_CMD, cmd)
+    if status:
+        raise OSError(f"admin opcode 0x{opcode:02x} failed: NVMe status 0x{status:x}")
+    return _NVME_ADMIN_CMD.unpack(cmd)[-1]
+
+def identify_controller(ctrl: str) -> Dict[str, Any]:
+    """
+    Identify Controller (CNS 0x01) fields keyed like `nvme id-ctrl -o json`: one ioctl
+    on the controller node when permitted, else nvme-cli. {} if both fail.
+    """
+    buf = ctypes.create_string_buffer(4096)
+    try:
+        fd = os.open(ctrl, os.O_RDONLY)
+        try:
+            _nvme_admin(fd, 0x06, 0, 0x01, ctypes.addressof(buf), len(buf))
+        finally:
+            os.close(fd)
+        raw = buf.raw
+        vid, ssvid = struct.unpack_from("<HH", raw, 0)
+
+        def text(a: int, b: int) -> str:  # space-padded ASCII fields
+            return raw[a:b].decode("ascii", errors="replace").strip(" \x00")
+
+        return {"vid": vid, "ssvid": ssvid, "sn": text(4, 24), "mn": text(24, 64), "fr": text(64, 72)}
+    except OSError:
+        pass
+    try:
+        return _json_loads(run_argv(["nvme", "id-ctrl", "-o", "json", ctrl]))
+    except Exception:
+        return {}
+
+class SmartReader:
+    """
+    SMART/Health log (Get Log Page, LID 0x02) via the NVMe admin passthrough ioctl on
+    one fd kept open across samples: no nvme-cli fork or JSON parse per reading.
+    Needs root; falsy if the device can't be opened. sample() raises OSError on failure
+    and returns the nvme-cli JSON keys the samples read.
+    """
+    def __init__(self, dev: str):
+        self._buf = (ctypes.c_ubyte * _SMART_LOG_LEN)()
+        try:
+            self._fd: Optional[int] = os.open(dev, os.O_RDONLY)
+        except OSError:
+            self._fd = None
+
+    def __bool__(self) -> bool:
+        return self._fd is not None
+
+    def sample(self) -> Dict[str, Any]:
+        # NSID 0xFFFFFFFF = controller-wide log (nvme-cli's default); NUMDL = dwords - 1.
+        _nvme_admin(self._fd, 0x02, 0xFFFFFFFF, 0x02 | ((_SMART_LOG_LEN // 4 - 1) << 16),
+                    ctypes.addressof(self._buf), _SMART_LOG_LEN)
+        crit, temp_k, pct = _SMART_HEAD.unpack_from(self._buf, 0)
+
+        def u128(off: int) -> int:
+            lo, hi = _SMART_U128.unpack_from(self._buf, off)
+            return lo | (hi << 64)
+
+        return {
+            "critical_warning": crit,
+            "temperature": temp_k,
+            "avail_spare": self._buf[3],
+            "spare_thresh": self._buf[4],
+            "percentage_used": pct,
+            "power_on_hours": u128(128),
+            "unsafe_shutdowns": u128(144),
+            "media_errors": u128(160),
+        }
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
 
 def kelvin_to_celsius(kelvin_temp: float) -> float:
     """Convert temperature from Kelvin to Celsius"""
@@ -121,7 +289,7 @@ def debug_smart_data(ns: str) -> None:
         return
     
     try:
-        health_data = json.loads(raw_health)
+        health_data = _json_loads(raw_health)
         print("=== Raw SMART Data Structure ===")
         for key, value in health_data.items():
             if "temp" in key.lower():
@@ -129,24 +297,24 @@ def debug_smart_data(ns: str) -> None:
         print("=== All SMART Fields ===")
         for key, value in health_data.items():
             print(f"{key}: {value}")
-    except json.JSONDecodeError as e:
+    except ValueError as e:  # json/orjson decode errors are ValueErrors
         print(f"JSON decode error: {e}")
 
+_TEMP_FIELDS = (
+    "temperature",           # Standard temperature field
+    "composite_temperature", # Composite temperature
+    "temperature_sensor_1",  # First temperature sensor
+    "temp"                  # Alternative field name
+)
+
 def get_temperature_celsius(health_data: dict) -> float:
     """Extract and convert temperature from SMART data to Celsius"""
-    temp_fields = [
-        "temperature",           # Standard temperature field
-        "composite_temperature", # Composite temperature
-        "temperature_sensor_1",  # First temperature sensor
-        "temp"                  # Alternative field name
-    ]
-    
-    for field in temp_fields:
+    for field in _TEMP_FIELDS:
         if field in health_data:
             temp_value = health_data[field]
             if isinstance(temp_value, (int, float)) and temp_value > 0:
                 if 250 <= temp_value <= 400:
-                    return kelvin_to_celsius(temp_value)
+                    return temp_value - 273.15  # kelvin_to_celsius, inlined (called per sample)
                 elif 0 <= temp_value <= 150:
                     return float(temp_value)
                 print(f"Warning: Suspicious temperature value {temp_value} in field '{field}'")
@@ -154,7 +322,7 @@ def get_temperature_celsius(health_data: dict) -> float:
     return 0.0
 
 def check_sudo_access() -> bool:
-    return os.geteuid() == 0 or subprocess.call("sudo -n true", shell=True) == 0
+    return os.geteuid() == 0 or subprocess.call(["sudo", "-n", "true"], stderr=subprocess.DEVNULL) == 0
 
 def print_header(title: str):
     print("=" * 60)
@@ -93,6 +93,8 @@ def save_performance_data_csv(fio_results: Dict, device: str, filepath: str) ->
     fieldnames = ['timestamp', 'device', 'workload', 'iops', 'latency_us', 'bandwidth_mbps', 'runtime_sec']
     return save_to_csv(perf_data, filepath, fieldnames)
 
+DEVICE_INFO_FIELDS = ['controller', 'namespace', 'pci_bdf', 'model', 'serial', 'firmware', 'link_speed', 'link_width']
+
 def save_device_info_csv(devices_info: List[Dict], filepath: str) -> str:
     if not devices_info:
         return "No device info to save"
@@ -111,8 +113,23 @@ def save_device_info_csv(devices_info: List[Dict], filepath: str) -> str:
         }
         device_data.append(row)
     
-    fieldnames = ['controller', 'namespace', 'pci_bdf', 'model', 'serial', 'firmware', 'link_speed', 'link_width']
-    return save_to_csv(device_data, filepath, fieldnames)
+    return save_to_csv(device_data, filepath, DEVICE_INFO_FIELDS)
+
+def save_device_info_csv_rows(rows: List[tuple], filepath: str) -> str:
+    """Write rows already ordered as DEVICE_INFO_FIELDS (no per-row dicts)."""
+    if not rows:
+        return "No device info to save"
+    
+    filepath = ensure_csv_dir(filepath)
+    
+    try:
+        with open(filepath, 'w', newline='', encoding='utf-8', buffering=1 << 16) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(DEVICE_INFO_FIELDS)
+            writer.writerows(rows)
+        return f"Successfully saved {len(rows)} rows to {filepath}"
+    except Exception as e:
+        return f"Error saving CSV: {e}"
 
 def append_to_csv(data: Dict, filepath: str, fieldnames: List[str]) -> str:
     filepath = ensure_csv_dir(filepath)